@@ -0,0 +1,411 @@
+import numpy as np
+from scipy.signal import lfilter
+from src.tracking.teams import REFEREE, TEAM_A, TEAM_B, TEAM_NAMES, UNKNOWN
+
+FPS = 25
+WINDOW_SECONDS = 60          # rolling window ("per minute")
+SPRINT_SPEED = 7.0           # m/s (25.2 km/h)
+HIGH_INTENSITY_SPEED = 5.5   # m/s (19.8 km/h)
+SPEED_SMOOTHING = 0.2        # EMA weight of the newest frame-to-frame speed
+MAX_GAP_SECONDS = 1.0        # longer gaps restart a track's motion (no distance bridged)
+MAX_PLAYERS = 64             # initial number of player slots (grows if needed)
+
+# Shape groups: Team A, Team B, and all non-referee players
+GROUPS = ("Team A", "Team B", "All")
+
+
+def _group_masks(teams):
+    """
+    (G, N) bool membership of players in GROUPS from their team labels.
+    """
+    teams = np.asarray(teams)
+    return np.stack([teams == TEAM_A, teams == TEAM_B, teams != REFEREE])
+
+
+def _team_shape(positions, masks):
+    """
+    Per-group centroid and compactness (mean distance to the centroid) for one frame.
+
+    Returns:
+    --------
+    (G, 3) array of [cx, cy, compactness] and (G,) player counts
+    """
+
+    counts = masks.sum(axis=1)
+    safe = np.maximum(counts, 1)[:, None]
+
+    centroids = (masks @ positions) / safe
+    dists = np.linalg.norm(positions[None, :, :] - centroids[:, None, :], axis=2)
+    compactness = (masks * dists).sum(axis=1) / safe[:, 0]
+
+    return np.column_stack([centroids, compactness]), counts
+
+
+def _shape_summary(sums, valid):
+    summary = {}
+    for g, name in enumerate(GROUPS):
+        if valid[g] == 0:
+            summary[name] = {"centroid": None, "compactness": None}
+        else:
+            summary[name] = {
+                "centroid": [float(sums[g, 0] / valid[g]), float(sums[g, 1] / valid[g])],
+                "compactness": float(sums[g, 2] / valid[g]),
+            }
+    return summary
+
+
+class StreamingAnalytics:
+    """
+    Live match metrics from per-frame field tracks, O(players) work per frame.
+
+    Call update() once per frame with the frame's field_tracks (as produced by
+    Tracker.run). Per player it keeps total distance, high-intensity-run
+    distance, sprint count and smoothed speed; over a rolling window it keeps
+    each player's distance and every group's formation centroid and compactness.
+    Rolling sums are maintained with fixed-size NumPy ring buffers: the row
+    leaving the window is subtracted, the new frame's row added.
+
+    Speeds are exponentially smoothed frame-to-frame speeds. A sprint is a
+    rising edge of smoothed speed above sprint_speed; high-intensity distance
+    is distance covered while smoothed speed is above hir_speed.
+
+    Team shapes use the team labels passed with each frame. During tracking
+    these are provisional (UNKNOWN until a track is classified, and they may
+    change when the classifier refits), while saved outputs carry the final
+    labels. relabel() applies final labels and recomputes the rolling-window
+    shapes from the window's positions; closed windows in ``minutes`` keep the
+    labels that were known when they closed.
+    """
+
+    def __init__(self, fps: float = FPS, window_seconds: float = WINDOW_SECONDS,
+                 sprint_speed: float = SPRINT_SPEED, hir_speed: float = HIGH_INTENSITY_SPEED,
+                 smoothing: float = SPEED_SMOOTHING, max_gap_seconds: float = MAX_GAP_SECONDS,
+                 max_players: int = MAX_PLAYERS):
+        self.fps = fps
+        self.window = max(int(round(window_seconds * fps)), 1)
+        self.sprint_speed = sprint_speed
+        self.hir_speed = hir_speed
+        self.smoothing = smoothing
+        self.max_gap = max(int(round(max_gap_seconds * fps)), 1)
+
+        self.tick = -1                 # number of update() calls - 1
+        self.frame_id = None
+        self.minutes = []              # closed windows: team shape per completed window
+
+        self._slots = {}               # track_id -> slot
+        self._finished = {}            # track_id -> totals of tracks whose slot was recycled
+        self._alloc(max_players)
+
+        g = len(GROUPS)
+        self._shape_ring = np.zeros((self.window, g, 3))
+        self._shape_valid_ring = np.zeros((self.window, g), dtype=np.int64)
+        self._shape_sums = np.zeros((g, 3))
+        self._shape_valid = np.zeros(g, dtype=np.int64)
+
+    def _alloc(self, n):
+        self.track_ids = np.full(n, -1, dtype=np.int64)
+        self.team = np.full(n, UNKNOWN, dtype=np.int64)
+        self.last_pos = np.zeros((n, 2))
+        self.last_frame = np.zeros(n, dtype=np.int64)
+        self.last_tick = np.full(n, -1, dtype=np.int64)
+        self.moving = np.zeros(n, dtype=bool)        # has a speed estimate in the current segment
+        self.speed = np.zeros(n)
+        self.sprinting = np.zeros(n, dtype=bool)
+        self.distance = np.zeros(n)
+        self.hir_distance = np.zeros(n)
+        self.sprints = np.zeros(n, dtype=np.int64)
+
+        self._dist_ring = np.zeros((self.window, n))
+        self._hir_ring = np.zeros((self.window, n))
+        self._pos_ring = np.zeros((self.window, n, 2))
+        self._seen_ring = np.zeros((self.window, n), dtype=bool)
+        self.window_distance = np.zeros(n)
+        self.window_hir_distance = np.zeros(n)
+
+    def _grow(self):
+        n = len(self.track_ids)
+        old = {name: getattr(self, name) for name in (
+            "track_ids", "team", "last_pos", "last_frame", "last_tick", "moving", "speed", "sprinting",
+            "distance", "hir_distance", "sprints", "window_distance", "window_hir_distance",
+        )}
+        rings = {name: getattr(self, name) for name in ("_dist_ring", "_hir_ring", "_pos_ring", "_seen_ring")}
+
+        self._alloc(2 * n)
+
+        for name, values in old.items():
+            getattr(self, name)[:n] = values
+        for name, values in rings.items():
+            getattr(self, name)[:, :n] = values
+
+    def _retire_stale(self):
+        """
+        Free slots of tracks unseen for a full window (their ring columns are all zero by then).
+        """
+
+        stale = np.flatnonzero((self.track_ids >= 0) & (self.tick - self.last_tick >= self.window))
+        for slot in stale.tolist():
+            tid = int(self.track_ids[slot])
+            self._finished[tid] = self._slot_totals(slot)
+            del self._slots[tid]
+            self.track_ids[slot] = -1
+
+    def _slot_for(self, tid):
+        slot = self._slots.get(tid)
+        if slot is not None:
+            return slot
+
+        free = np.flatnonzero(self.track_ids < 0)
+        if len(free) == 0:
+            self._grow()
+            free = np.flatnonzero(self.track_ids < 0)
+        slot = int(free[0])
+
+        self.track_ids[slot] = tid
+        self.last_tick[slot] = -1
+        self.moving[slot] = False
+        self.sprinting[slot] = False
+        self.speed[slot] = 0.0
+        self.distance[slot] = 0.0
+        self.hir_distance[slot] = 0.0
+        self.sprints[slot] = 0
+        self.window_distance[slot] = 0.0
+        self.window_hir_distance[slot] = 0.0
+
+        # A track coming back after its slot was recycled keeps its totals
+        totals = self._finished.pop(tid, None)
+        if totals is not None:
+            self.distance[slot] = totals["distance"]
+            self.hir_distance[slot] = totals["hir_distance"]
+            self.sprints[slot] = totals["sprints"]
+
+        self._slots[tid] = slot
+        return slot
+
+    def update(self, frame_id: int, field_tracks):
+        """
+        Consume one frame of field tracks: [{"track_id", "field_pos", "team"?}, ...].
+        """
+
+        ids = [obj["track_id"] for obj in field_tracks]
+        positions = [obj["field_pos"] for obj in field_tracks]
+        teams = [obj.get("team", UNKNOWN) for obj in field_tracks]
+        self.update_arrays(frame_id, ids, positions, teams)
+
+    def update_arrays(self, frame_id: int, track_ids, positions, teams=None):
+        """
+        Array form of update(): track_ids (N,), positions (N, 2) in meters, teams (N,).
+        """
+
+        self.tick += 1
+        self.frame_id = frame_id
+        row = self.tick % self.window
+
+        # Evict the frame leaving the window
+        self.window_distance -= self._dist_ring[row]
+        self.window_hir_distance -= self._hir_ring[row]
+        self._dist_ring[row] = 0.0
+        self._hir_ring[row] = 0.0
+        self._seen_ring[row] = False
+        self._shape_sums -= self._shape_ring[row]
+        self._shape_valid -= self._shape_valid_ring[row]
+
+        if self.tick % self.window == 0:
+            self._retire_stale()
+
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        teams = np.full(len(positions), UNKNOWN) if teams is None else np.asarray(teams, dtype=np.int64)
+        slots = np.array([self._slot_for(int(tid)) for tid in track_ids], dtype=np.int64)
+
+        if len(slots):
+            # Motion since each player's previous observation
+            gap = frame_id - self.last_frame[slots]
+            cont = (self.last_tick[slots] >= 0) & (gap > 0) & (gap <= self.max_gap)
+
+            step = np.where(cont, np.linalg.norm(positions - self.last_pos[slots], axis=1), 0.0)
+            raw_speed = step * self.fps / np.maximum(gap, 1)
+
+            was_moving = self.moving[slots] & cont
+            speed = np.where(was_moving,
+                             self.smoothing * raw_speed + (1 - self.smoothing) * self.speed[slots],
+                             raw_speed)
+
+            sprint_now = cont & (speed >= self.sprint_speed)
+            hir_step = np.where(cont & (speed >= self.hir_speed), step, 0.0)
+
+            self.sprints[slots] += sprint_now & ~(self.sprinting[slots] & was_moving)
+            self.sprinting[slots] = sprint_now
+            self.speed[slots] = np.where(cont, speed, 0.0)
+            self.moving[slots] = cont
+
+            self.distance[slots] += step
+            self.hir_distance[slots] += hir_step
+            self._dist_ring[row, slots] = step
+            self._hir_ring[row, slots] = hir_step
+            self._pos_ring[row, slots] = positions
+            self._seen_ring[row, slots] = True
+            self.window_distance[slots] += step
+            self.window_hir_distance[slots] += hir_step
+
+            self.last_pos[slots] = positions
+            self.last_frame[slots] = frame_id
+            self.last_tick[slots] = self.tick
+            self.team[slots] = teams
+
+        # Team shape of this frame
+        shape, counts = _team_shape(positions, _group_masks(teams))
+        valid = (counts > 0).astype(np.int64)
+        shape[valid == 0] = 0.0
+        self._shape_ring[row] = shape
+        self._shape_valid_ring[row] = valid
+        self._shape_sums += shape
+        self._shape_valid += valid
+
+        if (self.tick + 1) % self.window == 0:
+            self.minutes.append(_shape_summary(self._shape_sums, self._shape_valid))
+
+    def relabel(self, labels):
+        """
+        Apply (final) team labels and recompute the rolling-window team shapes.
+
+        :param labels: {track_id: team label}, e.g. TeamClassifier.labels after Tracker.run;
+            tracks not in it keep their current label
+        """
+
+        for tid, team in labels.items():
+            slot = self._slots.get(int(tid))
+            if slot is not None:
+                self.team[slot] = team
+            elif int(tid) in self._finished:
+                self._finished[int(tid)]["team"] = TEAM_NAMES[int(team)]
+
+        self._shape_ring[:] = 0.0
+        self._shape_valid_ring[:] = 0
+
+        for row in range(min(self.tick + 1, self.window)):
+            slots = np.flatnonzero(self._seen_ring[row])
+            shape, counts = _team_shape(self._pos_ring[row, slots], _group_masks(self.team[slots]))
+            valid = (counts > 0).astype(np.int64)
+            shape[valid == 0] = 0.0
+            self._shape_ring[row] = shape
+            self._shape_valid_ring[row] = valid
+
+        self._shape_sums = self._shape_ring.sum(axis=0)
+        self._shape_valid = self._shape_valid_ring.sum(axis=0)
+
+    def _slot_totals(self, slot):
+        return {
+            "team": TEAM_NAMES[int(self.team[slot])],
+            "distance": float(self.distance[slot]),
+            "hir_distance": float(self.hir_distance[slot]),
+            "sprints": int(self.sprints[slot]),
+            "speed": float(self.speed[slot]) if self.moving[slot] else 0.0,
+            "window_distance": float(self.window_distance[slot]),
+            "window_hir_distance": float(self.window_hir_distance[slot]),
+        }
+
+    def snapshot(self):
+        """
+        Current metrics: per-player totals and rolling-window values, team shape over the window.
+        """
+
+        players = dict(self._finished)
+        for tid, slot in self._slots.items():
+            players[tid] = self._slot_totals(slot)
+
+        return {
+            "frame_id": self.frame_id,
+            "players": players,
+            "teams": _shape_summary(self._shape_sums, self._shape_valid),
+            "minutes": list(self.minutes),
+        }
+
+
+def batch_compute(field_results, fps: float = FPS, window_seconds: float = WINDOW_SECONDS,
+                  sprint_speed: float = SPRINT_SPEED, hir_speed: float = HIGH_INTENSITY_SPEED,
+                  smoothing: float = SPEED_SMOOTHING, max_gap_seconds: float = MAX_GAP_SECONDS):
+    """
+    Offline recomputation of StreamingAnalytics.snapshot() from a whole match.
+
+    :param field_results: tracking_field_coords.json content (one entry per processed frame)
+    """
+
+    window = max(int(round(window_seconds * fps)), 1)
+    max_gap = max(int(round(max_gap_seconds * fps)), 1)
+    n_ticks = len(field_results)
+    last_tick = n_ticks - 1
+
+    ticks, frames, tids, xs, ys, teams = [], [], [], [], [], []
+    for tick, frame in enumerate(field_results):
+        for obj in frame["field_tracks"]:
+            ticks.append(tick)
+            frames.append(frame["frame_id"])
+            tids.append(obj["track_id"])
+            xs.append(obj["field_pos"][0])
+            ys.append(obj["field_pos"][1])
+            teams.append(obj.get("team", UNKNOWN))
+
+    ticks = np.array(ticks, dtype=np.int64)
+    frames = np.array(frames, dtype=np.int64)
+    tids = np.array(tids, dtype=np.int64)
+    pos = np.column_stack([np.array(xs, dtype=np.float64), np.array(ys, dtype=np.float64)]).reshape(-1, 2)
+    teams = np.array(teams, dtype=np.int64)
+
+    # Players: observations of each track in time order
+    players = {}
+    order = np.lexsort((ticks, tids))
+    bounds = np.flatnonzero(np.diff(tids[order])) + 1
+
+    for idx in np.split(order, bounds) if len(order) else []:
+        tid = int(tids[idx[0]])
+        gap = np.diff(frames[idx])
+        cont = (gap > 0) & (gap <= max_gap)
+        step = np.where(cont, np.linalg.norm(np.diff(pos[idx], axis=0), axis=1), 0.0)
+        raw_speed = step * fps / np.maximum(gap, 1)
+
+        # EMA of speed restarted at every segment start
+        speed = np.zeros(len(step))
+        sprinting = np.zeros(len(step), dtype=bool)
+        seg_bounds = np.flatnonzero(~cont)
+        seg_starts = np.concatenate(([0], seg_bounds + 1))
+        seg_ends = np.concatenate((seg_bounds, [len(step)]))
+        for s, e in zip(seg_starts, seg_ends):
+            if e <= s:
+                continue
+            x = raw_speed[s:e]
+            speed[s:e], _ = lfilter([smoothing], [1, -(1 - smoothing)], x, zi=[(1 - smoothing) * x[0]])
+            sprinting[s:e] = speed[s:e] >= sprint_speed
+
+        prev_sprinting = np.concatenate(([False], sprinting[:-1])) & np.concatenate(([False], cont[:-1]))
+        hir_step = np.where(cont & (speed >= hir_speed), step, 0.0)
+        in_window = ticks[idx[1:]] > last_tick - window
+
+        players[tid] = {
+            "team": TEAM_NAMES[int(teams[idx[-1]])],
+            "distance": float(step.sum()),
+            "hir_distance": float(hir_step.sum()),
+            "sprints": int((sprinting & ~prev_sprinting).sum()),
+            "speed": float(speed[-1]) if len(step) and cont[-1] else 0.0,
+            "window_distance": float(step[in_window].sum()),
+            "window_hir_distance": float(hir_step[in_window].sum()),
+        }
+
+    # Team shape: per-frame group centroids / compactness, averaged over windows
+    g = len(GROUPS)
+    shape = np.zeros((n_ticks, g, 3))
+    valid = np.zeros((n_ticks, g), dtype=np.int64)
+    starts = np.searchsorted(ticks, np.arange(n_ticks + 1))
+    for tick in range(n_ticks):
+        sl = slice(starts[tick], starts[tick + 1])
+        s, counts = _team_shape(pos[sl], _group_masks(teams[sl]))
+        valid[tick] = counts > 0
+        shape[tick] = np.where(valid[tick][:, None] > 0, s, 0.0)
+
+    def window_summary(lo, hi):
+        return _shape_summary(shape[lo:hi].sum(axis=0), valid[lo:hi].sum(axis=0))
+
+    return {
+        "frame_id": field_results[-1]["frame_id"] if field_results else None,
+        "players": players,
+        "teams": window_summary(max(n_ticks - window, 0), n_ticks),
+        "minutes": [window_summary(m * window, (m + 1) * window) for m in range(n_ticks // window)],
+    }
@@ -1,11 +1,16 @@
 import os
 import cv2
 import json
-from ultralytics import YOLO
+import numpy as np
+from src.detection.tiling import make_tiles, nms, select_tiles
 from src.preprocessing.video_loader import VideoLoader
+from src.tracking.records import RecordBuffer
+from src.visualization.annotate_video import draw_boxes, draw_labels
 
 class PlayerDetectorCPU:
-    def __init__(self, model_path: str, output_dir: str, conf_thresh: float = 0.4, skip_frames: int = 5, resize_width: int = 640):
+    def __init__(self, model_path: str, output_dir: str, conf_thresh: float = 0.4, skip_frames: int = 5, resize_width: int = 640,
+                 render_video: bool = False, tile_size: int = None, tile_overlap: float = 0.2,
+                 pitch_polygon=None, full_refresh: int = 10, nms_thresh: float = 0.5, model=None):
         """
         CPU-friendly YOLOv8 player detector with frame skipping and resizing
         :param model_path: path to YOLOv8 weights
@@ -13,24 +18,59 @@ class PlayerDetectorCPU:
         :param conf_thresh: detection confidence threshold
         :param skip_frames: process every nth frame
         :param resize_width: width to resize frames (maintains aspect ratio)
+        :param render_video: draw boxes and encode an output video (data-only JSON when False)
+        :param tile_size: enable tiled inference on the full-resolution frame with square tiles
+            of this size (None = off); tiles are batched in one predict call and merged with
+            the resized full-frame pass
+        :param tile_overlap: fraction of overlap between neighbouring tiles
+        :param pitch_polygon: pitch corners in original-resolution pixels; only tiles overlapping
+            the pitch or last-seen players are re-run
+        :param full_refresh: run every tile on each nth processed frame so new players are found
+        :param nms_thresh: overlap threshold for merging boxes across tiles
+        :param model: already constructed model exposing ultralytics' predict() API;
+            loaded from model_path when None
         """
         self.model_path = model_path
         self.output_dir = output_dir
         self.conf_thresh = conf_thresh
         self.skip_frames = skip_frames
         self.resize_width = resize_width
+        self.render_video = render_video
+        self.records = None
+
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.pitch_polygon = pitch_polygon
+        self.full_refresh = full_refresh
+        self.nms_thresh = nms_thresh
+        self._reset_tiles()
 
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
-        print(f"🔹 Loading YOLO model from {self.model_path} (CPU mode)...")
-        self.model = YOLO(self.model_path)
-        print("✅ YOLO model loaded.")
+        if model is None:
+            from ultralytics import YOLO
+            print(f"🔹 Loading YOLO model from {self.model_path} (CPU mode)...")
+            model = YOLO(self.model_path)
+            print("✅ YOLO model loaded.")
+        self.model = model
+
+    def _reset_tiles(self):
+        """
+        Forget the tile grid, last-seen boxes and refresh phase (per video).
+        """
+        self._tiles = None
+        self._pitch_tiles = None
+        self._last_boxes = None
+        self._tiled_frames = 0
 
     def detect_video(self, video_path: str, output_video_name="output.mp4"):
         loader = VideoLoader(video_path)
         cap = loader.load()
 
+        # Tile grid and adaptive state belong to the previous video (resolution may differ)
+        self._reset_tiles()
+
         # Original size
         orig_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         orig_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -42,10 +82,12 @@ class PlayerDetectorCPU:
         resize_height = int(orig_height * scale)
 
         out_path = os.path.join(self.output_dir, output_video_name)
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        out_video = cv2.VideoWriter(out_path, fourcc, fps, (self.resize_width, resize_height))
+        out_video = None
+        if self.render_video:
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            out_video = cv2.VideoWriter(out_path, fourcc, fps, (self.resize_width, resize_height))
 
-        results_list = []
+        records = RecordBuffer()
         frame_count = 0
         saved_count = 0
 
@@ -68,34 +110,26 @@ class PlayerDetectorCPU:
             # Run YOLO detection
             results = self.model.predict(frame_resized, conf=self.conf_thresh, verbose=False)[0]
 
-            # Draw boxes and save detections
-            for box in results.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                cls_id = int(box.cls[0])
-
-                # Draw rectangle
-                cv2.rectangle(frame_resized, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                cv2.putText(
-                    frame_resized,
-                    f"{cls_id}:{conf:.2f}",
-                    (x1, y1 - 5),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.5,
-                    (0, 255, 0),
-                    1,
-                )
-
-                # Save detection info
-                results_list.append({
-                    "frame": frame_count,
-                    "class_id": cls_id,
-                    "confidence": conf,
-                    "bbox": [x1, y1, x2, y2]
-                })
-
-            # Write frame to output video
-            out_video.write(frame_resized)
+            bboxes = results.boxes.xyxy.cpu().numpy()
+            confs = results.boxes.conf.cpu().numpy()
+            class_ids = results.boxes.cls.cpu().numpy()
+
+            # Add small distant players from full-resolution tiles
+            if self.tile_size:
+                bboxes, confs, class_ids = self.detect_tiles(frame, scale, bboxes, confs, class_ids)
+
+            # Save detections (all boxes of the frame in one append)
+            bboxes = bboxes.astype(np.int32)
+            class_ids = class_ids.astype(np.int16)
+            records.append_frame(frame_count, bboxes, confs=confs, class_ids=class_ids)
+
+            # Draw boxes and write frame to output video (opt-in)
+            if out_video is not None:
+                labels = [f"{c}:{p:.2f}" for c, p in zip(class_ids.tolist(), confs.tolist())]
+                draw_boxes(frame_resized, bboxes)
+                draw_labels(frame_resized, bboxes, labels)
+                out_video.write(frame_resized)
+
             saved_count += 1
 
             # Print progress every 100 processed frames
@@ -103,15 +137,83 @@ class PlayerDetectorCPU:
                 print(f"Processed {saved_count} frames...")
 
         cap.release()
-        out_video.release()
+        if out_video is not None:
+            out_video.release()
+
+        self.records = records
+
+        # Save compact records + legacy JSON
+        records_path = os.path.join(self.output_dir, "detections.npy")
+        records.save(records_path)
 
-        # Save JSON
         json_path = os.path.join(self.output_dir, "detections.json")
         with open(json_path, "w") as f:
-            json.dump(results_list, f, indent=4)
+            json.dump(records.to_detection_json(), f)
 
-        print(f"✅ Detection finished. Output video: {out_path}")
+        print("✅ Detection finished.")
+        if out_video is not None:
+            print(f"✅ Output video: {out_path}")
         print(f"✅ Detection JSON: {json_path}")
+        print(f"✅ Detection records: {records_path}")
+        return records
+
+    def detect_tiles(self, frame, scale, bboxes, confs, class_ids):
+        """
+        Run the model on full-resolution tiles and merge with the resized-frame detections.
+
+        :param frame: original-resolution frame
+        :param scale: resized / original width ratio
+        :param bboxes, confs, class_ids: detections of the resized full-frame pass
+        :return: merged (bboxes, confs, class_ids) in resized-frame coordinates
+        """
+        h, w = frame.shape[:2]
+
+        if self._tiles is None:
+            self._tiles = make_tiles(w, h, self.tile_size, self.tile_overlap)
+            self._pitch_tiles = np.zeros(len(self._tiles), dtype=bool)
+            if self.pitch_polygon is not None:
+                self._pitch_tiles = select_tiles(self._tiles, frame.shape, pitch_polygon=self.pitch_polygon)
+
+        # Adaptive selection: pitch / last-seen tiles, all tiles on refresh frames
+        if self._tiled_frames % self.full_refresh == 0:
+            selected = np.ones(len(self._tiles), dtype=bool)
+        else:
+            selected = self._pitch_tiles.copy()
+            if self._last_boxes is not None and len(self._last_boxes):
+                selected |= select_tiles(self._tiles, frame.shape, last_boxes=self._last_boxes)
+        self._tiled_frames += 1
+
+        tiles = self._tiles[selected]
+
+        all_boxes = [bboxes / scale]
+        all_confs = [confs]
+        all_classes = [class_ids]
+        all_sources = [np.zeros(len(confs), dtype=np.int32)]
+
+        if len(tiles):
+            # One batched predict call for all selected tiles
+            crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+            tile_results = self.model.predict(crops, conf=self.conf_thresh, verbose=False)
+
+            for source, ((x1, y1, _, _), res) in enumerate(zip(tiles, tile_results), start=1):
+                all_boxes.append(res.boxes.xyxy.cpu().numpy() + [x1, y1, x1, y1])
+                all_confs.append(res.boxes.conf.cpu().numpy())
+                all_classes.append(res.boxes.cls.cpu().numpy())
+                all_sources.append(np.full(len(all_confs[-1]), source, dtype=np.int32))
+
+        boxes_full = np.concatenate(all_boxes).reshape(-1, 4)
+        confs = np.concatenate(all_confs)
+        class_ids = np.concatenate(all_classes)
+
+        sources = np.concatenate(all_sources)
+
+        # IoS only between passes (tile-border duplicates); IoU within a pass
+        keep = nms(boxes_full, confs, self.nms_thresh, class_ids=class_ids, sources=sources)
+        boxes_full, confs, class_ids = boxes_full[keep], confs[keep], class_ids[keep]
+
+        self._last_boxes = boxes_full
+
+        return boxes_full * scale, confs, class_ids
 
 
 # ==========================
@@ -127,6 +229,8 @@ if __name__ == "__main__":
         output_dir=output_dir,
         conf_thresh=0.4,
         skip_frames=5,       # process 1 frame every 5
-        resize_width=640     # resize frames to 640px width
+        resize_width=640,    # resize frames to 640px width
+        render_video=False,  # JSON only; set True to also write an annotated video
+        tile_size=None       # e.g. 640 for tiled full-res inference on wide 1080p/4K shots
     )
     detector.detect_video(video_path)
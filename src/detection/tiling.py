@@ -0,0 +1,151 @@
+import numpy as np
+import cv2
+
+
+def make_tiles(width: int, height: int, tile_size: int = 640, overlap: float = 0.2):
+    """
+    Split a frame into overlapping square tiles.
+
+    The last row/column of tiles is shifted back so every tile stays inside
+    the frame (and all tiles keep the same size when the frame is large enough).
+
+    Returns:
+    --------
+    (T, 4) int array of [x1, y1, x2, y2]
+    """
+
+    def starts(length):
+        size = min(tile_size, length)
+        step = max(int(size * (1 - overlap)), 1)
+        positions = list(range(0, length - size + 1, step))
+        if positions[-1] + size < length:
+            positions.append(length - size)
+        return np.array(positions), size
+
+    xs, tw = starts(width)
+    ys, th = starts(height)
+
+    gx, gy = np.meshgrid(xs, ys)
+    gx, gy = gx.ravel(), gy.ravel()
+
+    return np.stack([gx, gy, gx + tw, gy + th], axis=1)
+
+
+def box_overlap(a, b):
+    """
+    Pairwise intersection area between two sets of boxes.
+
+    Returns:
+    --------
+    (len(a), len(b)) float array
+    """
+
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+
+    iw = np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    ih = np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+
+    return np.clip(iw, 0, None) * np.clip(ih, 0, None)
+
+
+def select_tiles(tiles, frame_shape, pitch_polygon=None, last_boxes=None, margin: int = 32):
+    """
+    Choose which tiles to run on this frame.
+
+    A tile is selected if it overlaps the pitch polygon or any box (grown by
+    margin pixels) where a player was last seen. With neither given, all tiles run.
+
+    Parameters:
+    -----------
+    tiles : (T, 4) tiles from make_tiles
+    frame_shape : (height, width) of the full-resolution frame
+    pitch_polygon : list of (x, y) pitch corners in full-resolution pixels
+    last_boxes : (N, 4) boxes from the previous processed frame, full-resolution pixels
+
+    Returns:
+    --------
+    (T,) bool mask
+    """
+
+    tiles = np.asarray(tiles)
+
+    if pitch_polygon is None and last_boxes is None:
+        return np.ones(len(tiles), dtype=bool)
+
+    selected = np.zeros(len(tiles), dtype=bool)
+
+    if pitch_polygon is not None:
+        h, w = frame_shape[:2]
+        mask = np.zeros((h, w), dtype=np.uint8)
+        cv2.fillPoly(mask, [np.asarray(pitch_polygon, dtype=np.int32).reshape(-1, 1, 2)], 1)
+
+        # Pitch pixels per tile from an integral image (4 lookups per tile)
+        integral = cv2.integral(mask)
+        x1, y1, x2, y2 = tiles.T
+        inside = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+        selected |= inside > 0
+
+    if last_boxes is not None and len(last_boxes):
+        grown = np.asarray(last_boxes, dtype=np.float64).reshape(-1, 4) + [-margin, -margin, margin, margin]
+        selected |= (box_overlap(tiles, grown) > 0).any(axis=1)
+
+    return selected
+
+
+def nms(boxes, scores, iou_thresh: float = 0.5, class_ids=None, metric: str = "ios", sources=None):
+    """
+    Greedy non-maximum suppression over boxes merged from several tiles.
+
+    The full overlap matrix is computed once with NumPy; the greedy pass only
+    indexes into it. metric="ios" (intersection over the smaller box) also
+    suppresses partial boxes of a player cut by a tile border, which plain IoU misses.
+    Boxes of different classes never suppress each other.
+
+    sources gives the pass each box came from (e.g. 0 for the resized frame, 1..T
+    for tiles). With metric="ios", boxes from the same source are compared by IoU,
+    so two overlapping players found in one pass are not merged.
+
+    Returns:
+    --------
+    indices of kept boxes, sorted by descending score
+    """
+
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if metric not in ("ios", "iou"):
+        raise ValueError(f"Unknown NMS metric: {metric}")
+
+    order = np.argsort(-scores, kind="stable")
+    boxes = boxes[order]
+
+    inter = box_overlap(boxes, boxes)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    overlap = inter / np.maximum(area[:, None] + area[None, :] - inter, 1e-9)
+
+    if metric == "ios":
+        ios = inter / np.maximum(np.minimum(area[:, None], area[None, :]), 1e-9)
+        if sources is None:
+            overlap = ios
+        else:
+            sources = np.asarray(sources)[order]
+            cross = sources[:, None] != sources[None, :]
+            overlap[cross] = ios[cross]
+
+    if class_ids is not None:
+        class_ids = np.asarray(class_ids)[order]
+        overlap[class_ids[:, None] != class_ids[None, :]] = 0
+
+    suppress = np.triu(overlap > iou_thresh, k=1)
+
+    keep = np.ones(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if keep[i]:
+            keep[i + 1:] &= ~suppress[i, i + 1:]
+
+    return order[keep]
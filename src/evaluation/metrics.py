@@ -0,0 +1,114 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from src.tracking.association import iou_matrix
+
+
+def frames_from_tracking_json(data):
+    """
+    Convert tracking_output.json content to {frame_id: (track_ids, bboxes)}.
+    """
+
+    frames = {}
+
+    for frame in data:
+        tracks = frame["tracks"]
+        ids = np.array([t["track_id"] for t in tracks], dtype=np.int64)
+        bboxes = np.array([t["bbox"] for t in tracks], dtype=np.float64).reshape(-1, 4)
+        frames[frame["frame_id"]] = (ids, bboxes)
+
+    return frames
+
+
+def mot_metrics(gt_frames, pred_frames, iou_thresh: float = 0.5):
+    """
+    CLEAR-MOT (MOTA) and identity (IDF1) metrics.
+
+    Per frame, ground-truth and predicted boxes are matched with the Hungarian
+    algorithm on IoU (pairs below iou_thresh never match). An ID switch is
+    counted when a ground-truth track is matched to a different predicted ID
+    than the last time it was matched. IDF1 uses the one-to-one ground-truth /
+    predicted ID mapping that maximizes the number of matched frames.
+
+    Parameters:
+    -----------
+    gt_frames, pred_frames : {frame_id: (track_ids (N,), bboxes (N, 4))}
+
+    Returns:
+    --------
+    dict with mota, idf1, matches, false_positives, misses, id_switches, num_gt
+    """
+
+    num_gt = 0
+    num_pred = 0
+    matches = 0
+    id_switches = 0
+    last_match = {}
+    pair_counts = {}
+
+    for frame_id in sorted(set(gt_frames) | set(pred_frames)):
+        gt_ids, gt_boxes = gt_frames.get(frame_id, (np.empty(0), np.empty((0, 4))))
+        pr_ids, pr_boxes = pred_frames.get(frame_id, (np.empty(0), np.empty((0, 4))))
+
+        num_gt += len(gt_ids)
+        num_pred += len(pr_ids)
+
+        if len(gt_ids) == 0 or len(pr_ids) == 0:
+            continue
+
+        iou = iou_matrix(gt_boxes, pr_boxes)
+        rows, cols = linear_sum_assignment(-iou)
+        valid = iou[rows, cols] >= iou_thresh
+
+        for g, p in zip(np.asarray(gt_ids)[rows[valid]].tolist(), np.asarray(pr_ids)[cols[valid]].tolist()):
+            matches += 1
+            if g in last_match and last_match[g] != p:
+                id_switches += 1
+            last_match[g] = p
+            pair_counts[(g, p)] = pair_counts.get((g, p), 0) + 1
+
+    misses = num_gt - matches
+    false_positives = num_pred - matches
+    mota = 1.0 - (misses + false_positives + id_switches) / num_gt if num_gt else 1.0
+
+    # IDF1: best one-to-one mapping between ground-truth and predicted identities
+    idtp = 0
+    if pair_counts:
+        gt_index = {g: i for i, g in enumerate(sorted({g for g, _ in pair_counts}))}
+        pr_index = {p: i for i, p in enumerate(sorted({p for _, p in pair_counts}))}
+        counts = np.zeros((len(gt_index), len(pr_index)))
+        for (g, p), n in pair_counts.items():
+            counts[gt_index[g], pr_index[p]] = n
+        rows, cols = linear_sum_assignment(-counts)
+        idtp = int(counts[rows, cols].sum())
+
+    total = num_gt + num_pred
+    idf1 = 2.0 * idtp / total if total else 1.0
+
+    return {
+        "mota": mota,
+        "idf1": idf1,
+        "matches": matches,
+        "false_positives": false_positives,
+        "misses": misses,
+        "id_switches": id_switches,
+        "num_gt": num_gt,
+    }
+
+
+def projection_errors(mapper, bboxes, field_points):
+    """
+    Euclidean error (meters) between FieldMapper output and known field positions.
+
+    Parameters:
+    -----------
+    mapper : FieldMapper with correspondences set
+    bboxes : (N, 4) boxes whose bottom-center is the player's feet
+    field_points : (N, 2) true field positions in meters
+
+    Returns:
+    --------
+    (N,) array of errors
+    """
+
+    mapped = mapper.map_bboxes_to_field(bboxes)
+    return np.linalg.norm(mapped - np.asarray(field_points, dtype=np.float64).reshape(-1, 2), axis=1)
@@ -1,5 +1,5 @@
 import numpy as np
-from src.homography.transform_utils import compute_homography, apply_homography
+from src.homography.transform_utils import compute_homography, apply_homography, apply_homography_array
 
 
 class FieldMapper:
@@ -68,10 +68,26 @@ class FieldMapper:
         list of (field_x, field_y)
         """
 
-        mapped_positions = []
+        return [(float(x), float(y)) for x, y in self.map_bboxes_to_field(bboxes)]
 
-        for bbox in bboxes:
-            field_pos = self.map_bbox_to_field(bbox)
-            mapped_positions.append(field_pos)
+    def map_bboxes_to_field(self, bboxes):
+        """
+        Vectorized bottom-center mapping for all boxes of a frame.
+
+        Parameters:
+        -----------
+        bboxes : (N, 4) array-like of [x1, y1, x2, y2]
+
+        Returns:
+        --------
+        (N, 2) array of (field_x, field_y) in meters
+        """
+
+        if self.H is None:
+            raise ValueError("Homography matrix not initialized. Call set_correspondences() first.")
+
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+
+        feet = np.stack([(bboxes[:, 0] + bboxes[:, 2]) / 2.0, bboxes[:, 3]], axis=1)
 
-        return mapped_positions
+        return apply_homography_array(self.H, feet)
@@ -75,9 +75,29 @@ def apply_homography_multiple(H, points):
     list of (X, Y)
     """
 
-    transformed_points = []
+    return [(float(x), float(y)) for x, y in apply_homography_array(H, points)]
 
-    for pt in points:
-        transformed_points.append(apply_homography(H, pt))
 
-    return transformed_points
+def apply_homography_array(H, points):
+    """
+    Apply homography to an array of points in one matrix product.
+
+    Parameters:
+    -----------
+    H : 3x3 homography matrix
+    points : (N, 2) array-like of (x, y)
+
+    Returns:
+    --------
+    (N, 2) float64 array of (X, Y)
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+    points_h = np.hstack([points, np.ones((len(points), 1))])
+    mapped = points_h @ np.asarray(H, dtype=np.float64).T
+
+    if np.any(mapped[:, 2] == 0):
+        raise ZeroDivisionError("Invalid homography transformation.")
+
+    return mapped[:, :2] / mapped[:, 2:3]
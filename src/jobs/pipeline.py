@@ -0,0 +1,110 @@
+import json
+import os
+from src.analytics.streaming import FPS, batch_compute
+from src.jobs.store import JobStore
+from src.tracking.teams import UNKNOWN
+from src.tracking.tracker import Tracker
+from src.visualization.distance_ranking import calculate_distance
+
+# Stages run in order for every job. Detection runs inside the tracking stage
+# because Tracker.run detects and associates in a single model.track() call.
+STAGES = ("tracking", "analytics")
+
+PROGRESS_EVERY = 10   # frames between progress writes to the job store
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a worker when the job was cancelled while a stage was running.
+    """
+
+
+def load_model(config, model_loader=None):
+    """
+    Build the detection/tracking model for a job.
+
+    ``model_loader`` (a picklable callable taking the job config) is set by the
+    code that constructs JobService, never by job submitters; tests use it to
+    plug in a stub detector. Otherwise YOLO is loaded from ``config["model_path"]``.
+    """
+
+    if model_loader is not None:
+        return model_loader(config)
+
+    from ultralytics import YOLO
+    return YOLO(config.get("model_path", "models/detection/yolov8/yolov8m.pt"))
+
+
+def run_tracking(store, job_id, video_path, config, output_dir, model_loader=None):
+    def progress(done, total):
+        if done % PROGRESS_EVERY and done != total:
+            return
+        if store.is_cancel_requested(job_id):
+            raise JobCancelled(job_id)
+        store.set_progress(job_id, "tracking", done / total if total > 0 else 0.0)
+
+    tracker = Tracker(
+        render_video=config.get("render_video", False),
+        video_path=video_path,
+        output_dir=output_dir,
+        model=load_model(config, model_loader),
+        image_points=config.get("image_points"),
+        field_points=config.get("field_points"),
+        backend=config.get("tracker_backend", "bytetrack"),
+    )
+
+    if not tracker.run(progress_callback=progress):
+        raise RuntimeError(f"Cannot open video: {video_path}")
+
+
+def run_analytics(store, job_id, video_path, config, output_dir, model_loader=None):
+    with open(os.path.join(output_dir, "tracking_field_coords.json"), "r") as f:
+        data = json.load(f)
+
+    # Frame rate of the tracked video, saved by the tracking stage
+    fps = FPS
+    meta_path = os.path.join(output_dir, "tracking_meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, "r") as f:
+            fps = json.load(f)["fps"]
+
+    tracks = {}
+    teams = {}
+
+    for frame in data:
+        for obj in frame["field_tracks"]:
+            tracks.setdefault(obj["track_id"], []).append(obj["field_pos"])
+            teams[str(obj["track_id"])] = obj.get("team", UNKNOWN)
+
+    distances = {
+        str(tid): float(calculate_distance(coords)) if len(coords) > 1 else 0.0
+        for tid, coords in tracks.items()
+    }
+
+    with open(os.path.join(output_dir, "analytics.json"), "w") as f:
+        json.dump({
+            "distances": distances,
+            "teams": teams,
+            "match": batch_compute(data, fps=fps),
+        }, f, indent=4)
+
+
+STAGE_FUNCS = {
+    "tracking": run_tracking,
+    "analytics": run_analytics,
+}
+
+
+def run_stage(db_path, job_id, stage, video_path, config, output_dir, model_loader=None):
+    """
+    Worker-process entry point: run one pipeline stage of a job.
+    """
+
+    store = JobStore(db_path)
+
+    if store.is_cancel_requested(job_id):
+        raise JobCancelled(job_id)
+
+    store.set_progress(job_id, stage, 0.0)
+    STAGE_FUNCS[stage](store, job_id, video_path, config, output_dir, model_loader)
+    store.set_progress(job_id, stage, 1.0)
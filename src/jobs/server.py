@@ -0,0 +1,237 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from src.jobs.pipeline import STAGES, JobCancelled, run_stage
+from src.jobs.store import JobStore
+
+DB_PATH = "outputs/jobs/jobs.db"
+WORK_DIR = "outputs/jobs"
+HOST = "127.0.0.1"
+PORT = 8765
+
+WORKERS = 2                                       # jobs processed at the same time
+STAGE_LIMITS = {"tracking": 1, "analytics": 2}    # concurrent jobs per stage
+POLL_INTERVAL = 0.5                               # seconds between queue polls
+
+HTTP_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+                409: "Conflict", 415: "Unsupported Media Type"}
+
+
+class JobService:
+    """
+    Local asyncio job service: SQLite-backed queue, process worker pool and a small HTTP API.
+
+    HTTP API (JSON in / JSON out):
+        POST /jobs              {"video_path": ..., "config": {...}, "max_retries": 0} -> {"id": n}
+        GET  /jobs              list all jobs
+        GET  /jobs/<id>         status, stage, progress, attempts, error
+        POST /jobs/<id>/cancel  cancel a queued or running job
+
+    POST requests must be sent as application/json and requests from other web
+    origins are refused, so pages open in a browser cannot submit or cancel jobs.
+
+    :param model_loader: optional picklable callable(config) -> model run in the workers
+        instead of loading YOLO (e.g. a stub detector in tests); not settable over HTTP
+    """
+
+    def __init__(self, db_path: str = DB_PATH, work_dir: str = WORK_DIR, host: str = HOST, port: int = PORT,
+                 workers: int = WORKERS, stage_limits: dict = None, poll_interval: float = POLL_INTERVAL,
+                 model_loader=None):
+        self.store = JobStore(db_path)
+        self.work_dir = work_dir
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.stage_limits = dict(STAGE_LIMITS, **(stage_limits or {}))
+        self.poll_interval = poll_interval
+        self.model_loader = model_loader
+
+        self._pool = None
+        self._server = None
+        self._scheduler = None
+        self._running = set()
+
+    async def start(self):
+        recovered = self.store.recover()
+        if recovered:
+            print(f"🔁 Requeued {recovered} interrupted job(s).")
+
+        self._slots = asyncio.Semaphore(self.workers)
+        self._stage_slots = {stage: asyncio.Semaphore(self.stage_limits[stage]) for stage in STAGES}
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        self._server = await asyncio.start_server(self._handle_http, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._scheduler = asyncio.create_task(self._schedule())
+
+        print(f"✅ Job service listening on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        self._scheduler.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    # ==========================
+    # Scheduling
+    # ==========================
+    async def _schedule(self):
+        while True:
+            await self._slots.acquire()
+
+            # Keep the slot until a job is claimed; a store error must not kill the scheduler
+            job = None
+            while job is None:
+                try:
+                    job = self.store.claim_next()
+                except Exception as e:
+                    print(f"❌ Could not claim next job: {type(e).__name__}: {e}")
+                if job is None:
+                    await asyncio.sleep(self.poll_interval)
+
+            task = asyncio.create_task(self._run_job(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_job(self, job):
+        loop = asyncio.get_running_loop()
+        job_id = job["id"]
+        config = job["config"]
+        pool = None
+        output_dir = config.get("output_dir") or os.path.join(self.work_dir, f"job_{job_id}")
+
+        try:
+            for stage in STAGES:
+                if self.store.is_cancel_requested(job_id):
+                    raise JobCancelled(job_id)
+
+                async with self._stage_slots[stage]:
+                    pool = self._pool
+                    await loop.run_in_executor(
+                        pool, run_stage,
+                        self.store.db_path, job_id, stage, job["video_path"], config, output_dir,
+                        self.model_loader
+                    )
+
+            self.store.finish(job_id)
+            print(f"✅ Job {job_id} done.")
+        except JobCancelled:
+            self.store.mark_cancelled(job_id)
+            print(f"🛑 Job {job_id} cancelled.")
+        except asyncio.CancelledError:
+            raise
+        except BrokenProcessPool as e:
+            # A worker died (segfault, OOM kill); every later submit to this pool would fail too
+            if self._pool is pool:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                pool.shutdown(wait=False, cancel_futures=True)
+                print("🔁 Worker pool broken, started a new one.")
+            status = self.store.fail(job_id, f"{type(e).__name__}: {e}")
+            print(f"❌ Job {job_id} failed ({status}): worker process died")
+        except Exception as e:
+            status = self.store.fail(job_id, f"{type(e).__name__}: {e}")
+            print(f"❌ Job {job_id} failed ({status}): {e}")
+        finally:
+            self._slots.release()
+
+    # ==========================
+    # HTTP API
+    # ==========================
+    async def _handle_http(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                key, _, value = line.partition(":")
+                headers[key.strip().lower()] = value.strip()
+
+            body = b""
+            length = int(headers.get("content-length", 0))
+            if length:
+                body = await reader.readexactly(length)
+
+            if len(request_line) < 2:
+                status, payload = 400, {"error": "malformed request"}
+            elif not self._same_origin(headers):
+                status, payload = 403, {"error": "cross-origin requests are not allowed"}
+            elif request_line[0] == "POST" and not self._is_json(headers):
+                status, payload = 415, {"error": "POST body must be application/json"}
+            else:
+                status, payload = self._route(request_line[0], request_line[1], body)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": str(e)}
+
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+        writer.close()
+
+    def _same_origin(self, headers):
+        origin = headers.get("origin")
+        if origin is None:
+            return True
+        return origin in (f"http://{self.host}:{self.port}", f"http://localhost:{self.port}")
+
+    @staticmethod
+    def _is_json(headers):
+        return headers.get("content-type", "").split(";")[0].strip().lower() == "application/json"
+
+    def _route(self, method, path, body):
+        parts = [p for p in path.split("?")[0].split("/") if p]
+
+        if parts == ["jobs"] and method == "GET":
+            return 200, self.store.list()
+
+        if parts == ["jobs"] and method == "POST":
+            request = json.loads(body or b"{}")
+            if "video_path" not in request:
+                return 400, {"error": "video_path is required"}
+            job_id = self.store.submit(request["video_path"], request.get("config"),
+                                       max_retries=int(request.get("max_retries", 0)))
+            return 201, {"id": job_id}
+
+        if len(parts) >= 2 and parts[0] == "jobs" and parts[1].isdigit():
+            job_id = int(parts[1])
+            job = self.store.get(job_id)
+            if job is None:
+                return 404, {"error": f"job {job_id} not found"}
+
+            if len(parts) == 2 and method == "GET":
+                return 200, job
+
+            if parts[2:] == ["cancel"] and method == "POST":
+                if not self.store.request_cancel(job_id):
+                    return 409, {"error": f"job {job_id} is already {job['status']}"}
+                return 200, self.store.get(job_id)
+
+        return 404, {"error": f"no route for {method} {path}"}
+
+
+# ==========================
+# Example usage
+# ==========================
+if __name__ == "__main__":
+    service = JobService()
+    asyncio.run(service.serve_forever())
@@ -0,0 +1,192 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_path TEXT NOT NULL,
+    config TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_retries INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class JobStore:
+    """
+    Persistent SQLite job queue shared by the job service and its worker processes.
+
+    Every call opens its own short-lived connection, so one store object can be
+    used from the event loop and a fresh one from each worker process.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return closing(conn)
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["config"] = json.loads(job["config"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def submit(self, video_path: str, config: dict = None, max_retries: int = 0) -> int:
+        """
+        Add a job to the queue and return its ID.
+        """
+
+        now = time.time()
+
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO jobs (video_path, config, status, max_retries, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (video_path, json.dumps(config or {}), QUEUED, max_retries, now, now)
+            )
+            return cur.lastrowid
+
+    def get(self, job_id: int):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def list(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def claim_next(self):
+        """
+        Atomically move the oldest queued job to running and return it (None if the queue is empty).
+        """
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY id LIMIT 1", (QUEUED,)
+                ).fetchone()
+
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                conn.execute(
+                    "UPDATE jobs SET status = ?, stage = NULL, progress = 0, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (RUNNING, time.time(), row["id"])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return self.get(row["id"])
+
+    def set_progress(self, job_id: int, stage: str, progress: float):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET stage = ?, progress = ?, updated_at = ? WHERE id = ?",
+                (stage, float(progress), time.time(), job_id)
+            )
+
+    def finish(self, job_id: int):
+        self._set_status(job_id, DONE, progress=1.0)
+
+    def fail(self, job_id: int, error: str) -> str:
+        """
+        Record a failed attempt; requeue the job while it has retries left.
+
+        Returns the new status (queued or failed).
+        """
+
+        job = self.get(job_id)
+        status = QUEUED if job["attempts"] <= job["max_retries"] else FAILED
+        self._set_status(job_id, status, error=error)
+        return status
+
+    def request_cancel(self, job_id: int) -> bool:
+        """
+        Cancel a queued job immediately, or flag a running job so its worker stops.
+
+        Returns False if the job does not exist or has already finished.
+        """
+
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            if cur.rowcount:
+                return True
+
+            cur = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                (time.time(), job_id, RUNNING)
+            )
+            return bool(cur.rowcount)
+
+    def is_cancel_requested(self, job_id: int) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def mark_cancelled(self, job_id: int):
+        self._set_status(job_id, CANCELLED)
+
+    def recover(self) -> int:
+        """
+        Requeue jobs left running by a previous service that did not shut down cleanly.
+        """
+
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), updated_at = ? WHERE status = ?",
+                (QUEUED, time.time(), RUNNING)
+            )
+            return cur.rowcount
+
+    def _set_status(self, job_id: int, status: str, error: str = None, progress: float = None):
+        with self._connect() as conn:
+            if progress is None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = COALESCE(?, error), updated_at = ? WHERE id = ?",
+                    (status, error, time.time(), job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = COALESCE(?, error), progress = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (status, error, progress, time.time(), job_id)
+                )
+
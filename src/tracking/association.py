@@ -0,0 +1,354 @@
+import time
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+IOU_THRESH = 0.3       # minimum IoU for a track/detection match
+HIGH_THRESH = 0.5      # detections above this start tracks and are matched first
+LOW_THRESH = 0.1       # detections below this are dropped
+MAX_AGE = 30           # frames a lost track is kept for re-association
+BUCKET_MIN = 250       # use spatial buckets from this many boxes on either side (measured crossover)
+
+_INFEASIBLE = 1e6
+
+
+def iou_matrix(a, b):
+    """
+    Pairwise IoU between two sets of boxes.
+
+    Parameters:
+    -----------
+    a : (N, 4) array of [x1, y1, x2, y2]
+    b : (M, 4) array of [x1, y1, x2, y2]
+
+    Returns:
+    --------
+    (N, M) float array
+    """
+
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+
+    iw = np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    ih = np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    np.clip(iw, 0, None, out=iw)
+    np.clip(ih, 0, None, out=ih)
+    inter = iw * ih
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def iou_pairs(a, b, ia, ib):
+    """
+    IoU of selected pairs (a[ia[k]], b[ib[k]]) only.
+    """
+
+    a = a[ia]
+    b = b[ib]
+
+    iw = np.clip(np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0]), 0, None)
+    ih = np.clip(np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1]), 0, None)
+    inter = iw * ih
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+def candidate_pairs(a, b, cell_size=None):
+    """
+    Pairs of boxes that can overlap, found with a uniform grid on box centers.
+
+    With cells at least as large as every box, two overlapping boxes have
+    centers in the same or adjacent cells, so only the 3x3 neighbourhood of
+    each cell is compared instead of all N x M pairs.
+
+    Returns:
+    --------
+    (ia, ib) index arrays of candidate pairs
+    """
+
+    if len(a) == 0 or len(b) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    if cell_size is None:
+        sizes = np.concatenate([a[:, 2:] - a[:, :2], b[:, 2:] - b[:, :2]])
+        cell_size = max(float(sizes.max()), 1.0)
+
+    origin = np.minimum(a[:, :2].min(axis=0), b[:, :2].min(axis=0))
+    cells_a = np.floor(((a[:, :2] + a[:, 2:]) / 2 - origin) / cell_size).astype(np.int64)
+    cells_b = np.floor(((b[:, :2] + b[:, 2:]) / 2 - origin) / cell_size).astype(np.int64)
+
+    # One integer key per cell (+1 margin so neighbour offsets stay non-negative)
+    stride = int(max(cells_a[:, 1].max(), cells_b[:, 1].max())) + 3
+    key_b = (cells_b[:, 0] + 1) * stride + (cells_b[:, 1] + 1)
+    order_b = np.argsort(key_b, kind="stable")
+    sorted_b = key_b[order_b]
+
+    ia_all, ib_all = [], []
+
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            key_a = (cells_a[:, 0] + 1 + dx) * stride + (cells_a[:, 1] + 1 + dy)
+            lo = np.searchsorted(sorted_b, key_a, side="left")
+            hi = np.searchsorted(sorted_b, key_a, side="right")
+            counts = hi - lo
+
+            if counts.sum() == 0:
+                continue
+
+            # Expand each [lo, hi) range into explicit pairs without a Python loop
+            ia = np.repeat(np.arange(len(a)), counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            ib = order_b[np.repeat(lo, counts) + offsets]
+
+            ia_all.append(ia)
+            ib_all.append(ib)
+
+    if not ia_all:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    return np.concatenate(ia_all), np.concatenate(ib_all)
+
+
+def _solve(cost):
+    rows, cols = linear_sum_assignment(cost)
+    ok = cost[rows, cols] < _INFEASIBLE
+    return rows[ok], cols[ok]
+
+
+def associate(track_boxes, det_boxes, iou_thresh: float = IOU_THRESH, spatial_buckets=None, cell_size=None):
+    """
+    Match tracks to detections with a linear assignment on IoU.
+
+    Pairs below iou_thresh are never matched. The assignment maximizes the
+    number of matches first, then their total IoU.
+
+    With spatial_buckets (default: automatic from BUCKET_MIN boxes), IoU is only
+    computed for grid-neighbouring pairs and the assignment is solved separately
+    on each connected component of the overlap graph, which keeps crowded
+    frames far below the O(N x M) cost of the dense path. Both paths give the
+    same matches up to ties.
+
+    Returns:
+    --------
+    matches (K, 2) of [track_index, det_index], unmatched track indices, unmatched detection indices
+    """
+
+    a = np.asarray(track_boxes, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(det_boxes, dtype=np.float64).reshape(-1, 4)
+    n, m = len(a), len(b)
+
+    if spatial_buckets is None:
+        spatial_buckets = max(n, m) >= BUCKET_MIN
+
+    rows = np.empty(0, dtype=np.int64)
+    cols = np.empty(0, dtype=np.int64)
+
+    if n and m and not spatial_buckets:
+        iou = iou_matrix(a, b)
+        cost = np.where(iou >= iou_thresh, 1.0 - iou, _INFEASIBLE)
+        rows, cols = _solve(cost)
+
+    elif n and m:
+        ia, ib = candidate_pairs(a, b, cell_size)
+        iou = iou_pairs(a, b, ia, ib)
+        keep = iou >= iou_thresh
+        ia, ib, iou = ia[keep], ib[keep], iou[keep]
+
+        if len(ia):
+            # Connected components of the bipartite overlap graph (tracks 0..n-1, detections n..n+m-1)
+            graph = coo_matrix((np.ones(len(ia)), (ia, ib + n)), shape=(n + m, n + m))
+            _, labels = connected_components(graph, directed=False)
+
+            edge_comp = labels[ia]
+            comp_edges = np.bincount(edge_comp, minlength=labels.max() + 1)
+
+            # Components with a single edge: the match is forced
+            single = comp_edges[edge_comp] == 1
+            rows_list = [ia[single]]
+            cols_list = [ib[single]]
+
+            # Larger components: small dense assignment each
+            multi = np.flatnonzero(~single)
+            if len(multi):
+                order = multi[np.argsort(edge_comp[multi], kind="stable")]
+                bounds = np.flatnonzero(np.diff(edge_comp[order])) + 1
+                for edges in np.split(order, bounds):
+                    t_idx, t_local = np.unique(ia[edges], return_inverse=True)
+                    d_idx, d_local = np.unique(ib[edges], return_inverse=True)
+                    cost = np.full((len(t_idx), len(d_idx)), _INFEASIBLE)
+                    cost[t_local, d_local] = 1.0 - iou[edges]
+                    r, c = _solve(cost)
+                    rows_list.append(t_idx[r])
+                    cols_list.append(d_idx[c])
+
+            rows = np.concatenate(rows_list)
+            cols = np.concatenate(cols_list)
+
+    matches = np.stack([rows, cols], axis=1).astype(np.int64)
+
+    unmatched_tracks = np.setdiff1d(np.arange(n), rows)
+    unmatched_dets = np.setdiff1d(np.arange(m), cols)
+
+    return matches, unmatched_tracks, unmatched_dets
+
+
+class IoUTracker:
+    """
+    ByteTrack-style multi-object tracker on top of associate().
+
+    Track state is held in parallel NumPy arrays (no per-track objects).
+    Each frame: tracks are moved by their smoothed velocity, high-score
+    detections are matched first, low-score detections then try to recover the
+    remaining tracks, unmatched high-score detections start new tracks and
+    tracks unmatched for more than max_age frames are dropped.
+    """
+
+    def __init__(self, iou_thresh: float = IOU_THRESH, high_thresh: float = HIGH_THRESH,
+                 low_thresh: float = LOW_THRESH, max_age: int = MAX_AGE, spatial_buckets=None,
+                 velocity_smoothing: float = 0.5):
+        self.iou_thresh = iou_thresh
+        self.high_thresh = high_thresh
+        self.low_thresh = low_thresh
+        self.max_age = max_age
+        self.spatial_buckets = spatial_buckets
+        self.velocity_smoothing = velocity_smoothing
+
+        self.boxes = np.empty((0, 4))
+        self.velocity = np.empty((0, 4))
+        self.ids = np.empty(0, dtype=np.int64)
+        self.age = np.empty(0, dtype=np.int64)     # frames since last match
+        self._next_id = 1
+
+    def update(self, boxes, scores):
+        """
+        Associate one frame of detections.
+
+        Parameters:
+        -----------
+        boxes : (N, 4) detections [x1, y1, x2, y2]
+        scores : (N,) detection confidences
+
+        Returns:
+        --------
+        track_ids (K,) and det_indices (K,): the ID given to each kept detection
+        """
+
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+
+        high = np.flatnonzero(scores >= self.high_thresh)
+        low = np.flatnonzero((scores >= self.low_thresh) & (scores < self.high_thresh))
+
+        # age + 1 frames have passed since each track's box was last observed
+        predicted = self.boxes + self.velocity * (self.age + 1)[:, None]
+
+        # Stage 1: high-score detections against all tracks
+        m1, unmatched_tracks, unmatched_high = associate(
+            predicted, boxes[high], self.iou_thresh, self.spatial_buckets
+        )
+
+        # Stage 2: low-score detections against the tracks still unmatched
+        m2, _, _ = associate(
+            predicted[unmatched_tracks], boxes[low], self.iou_thresh, self.spatial_buckets
+        )
+
+        track_idx = np.concatenate([m1[:, 0], unmatched_tracks[m2[:, 0]]])
+        det_idx = np.concatenate([high[m1[:, 1]], low[m2[:, 1]]])
+
+        # Update matched tracks
+        matched = np.zeros(len(self.ids), dtype=bool)
+        matched[track_idx] = True
+
+        new_velocity = (boxes[det_idx] - self.boxes[track_idx]) / (self.age[track_idx] + 1)[:, None]
+        a = self.velocity_smoothing
+        self.velocity[track_idx] = a * new_velocity + (1 - a) * self.velocity[track_idx]
+        self.boxes[track_idx] = boxes[det_idx]
+        self.age[track_idx] = 0
+        self.age[~matched] += 1
+
+        # Drop tracks lost for too long
+        alive = self.age <= self.max_age
+        out_ids = self.ids[track_idx]
+        self.boxes, self.velocity, self.ids, self.age = (
+            self.boxes[alive], self.velocity[alive], self.ids[alive], self.age[alive]
+        )
+
+        # New tracks from unmatched high-score detections
+        new_dets = high[unmatched_high]
+        new_ids = np.arange(self._next_id, self._next_id + len(new_dets))
+        self._next_id += len(new_dets)
+
+        self.boxes = np.concatenate([self.boxes, boxes[new_dets]])
+        self.velocity = np.concatenate([self.velocity, np.zeros((len(new_dets), 4))])
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.age = np.concatenate([self.age, np.zeros(len(new_dets), dtype=np.int64)])
+
+        return np.concatenate([out_ids, new_ids]), np.concatenate([det_idx, new_dets])
+
+
+def _random_frames(n_boxes, n_frames, width, height, rng):
+    """
+    Players doing a random walk; detections come back shuffled with pixel noise.
+    """
+
+    size = np.array([20.0, 50.0])
+    pos = rng.uniform([0, 0], [width - size[0], height - size[1]], (n_boxes, 2))
+    vel = rng.normal(0, 2, (n_boxes, 2))
+
+    frames = []
+    for _ in range(n_frames):
+        pos = np.clip(pos + vel, 0, [width - size[0], height - size[1]])
+        boxes = np.hstack([pos, pos + size]) + rng.normal(0, 0.5, (n_boxes, 4))
+        order = rng.permutation(n_boxes)
+        frames.append((boxes[order], rng.uniform(0.6, 1.0, n_boxes)))
+    return frames
+
+
+def benchmark(sizes=(50, 200, 1000), n_frames: int = 50, width: int = 3840, height: int = 2160, seed: int = 0):
+    """
+    Time associate() (dense vs spatial buckets) and IoUTracker.update() per frame.
+
+    Returns:
+    --------
+    list of dicts with milliseconds per frame for each size
+    """
+
+    rng = np.random.default_rng(seed)
+    rows = []
+
+    for n in sizes:
+        frames = _random_frames(n, n_frames, width, height, rng)
+        row = {"boxes": n}
+
+        for name, buckets in (("dense_ms", False), ("bucketed_ms", True)):
+            start = time.perf_counter()
+            for (prev, _), (cur, _) in zip(frames[:-1], frames[1:]):
+                associate(prev, cur, spatial_buckets=buckets)
+            row[name] = 1000 * (time.perf_counter() - start) / (n_frames - 1)
+
+        tracker = IoUTracker()
+        start = time.perf_counter()
+        for boxes, scores in frames:
+            tracker.update(boxes, scores)
+        row["tracker_ms"] = 1000 * (time.perf_counter() - start) / n_frames
+
+        rows.append(row)
+
+    return rows
+
+
+# ==========================
+# Benchmark
+# ==========================
+if __name__ == "__main__":
+    print("⏱️ Association benchmark (ms per frame, 4K frame, random-walk players)")
+    print(f"{'boxes':>6} {'dense':>10} {'bucketed':>10} {'tracker':>10}")
+    for row in benchmark():
+        print(f"{row['boxes']:>6} {row['dense_ms']:>10.2f} {row['bucketed_ms']:>10.2f} {row['tracker_ms']:>10.2f}")
@@ -0,0 +1,256 @@
+from dataclasses import dataclass
+import numpy as np
+
+# One row per detection / track observation (51 bytes, vs ~400+ for a dict with a list bbox).
+# Pixel boxes are float32; conf and field positions stay float64 so JSON outputs and
+# distance/analytics recomputations match the values produced during tracking.
+# Missing values: track_id / class_id / team = -1, conf / fx / fy = NaN.
+RECORD_DTYPE = np.dtype([
+    ("frame", np.int32),
+    ("track_id", np.int32),
+    ("class_id", np.int16),
+    ("conf", np.float64),
+    ("x1", np.float32),
+    ("y1", np.float32),
+    ("x2", np.float32),
+    ("y2", np.float32),
+    ("fx", np.float64),
+    ("fy", np.float64),
+    ("team", np.int8),
+])
+
+BBOX_FIELDS = ["x1", "y1", "x2", "y2"]
+
+CONF_DECIMALS = 4   # model confidences are float32; round them in JSON outputs
+
+
+@dataclass
+class Record:
+    """
+    Lightweight read-only view of one buffer row for API consumers.
+    """
+
+    __slots__ = ("frame", "track_id", "class_id", "conf", "bbox", "field_pos", "team")
+
+    frame: int
+    track_id: int
+    class_id: int
+    conf: float
+    bbox: tuple
+    field_pos: tuple
+    team: int
+
+
+class RecordBuffer:
+    """
+    Growable array of RECORD_DTYPE rows.
+
+    The frame loop appends all boxes of a frame at once with append_frame(),
+    so no per-box Python objects are created; storage grows by doubling.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.empty(max(int(capacity), 1), dtype=RECORD_DTYPE)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for row in self.data:
+            yield self._to_record(row)
+
+    @property
+    def data(self):
+        """
+        Structured array view of the filled rows (no copy).
+        """
+        return self._data[:self._size]
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed <= len(self._data):
+            return
+
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+
+        grown = np.empty(capacity, dtype=RECORD_DTYPE)
+        grown[:self._size] = self._data[:self._size]
+        self._data = grown
+
+    def append_frame(self, frame: int, bboxes, confs=None, class_ids=None, track_ids=None, field_pos=None):
+        """
+        Append all boxes of one frame.
+
+        Parameters:
+        -----------
+        frame : frame number shared by all rows
+        bboxes : (N, 4) array of [x1, y1, x2, y2]
+        confs : (N,) confidences or None
+        class_ids : (N,) class IDs, a scalar, or None
+        track_ids : (N,) track IDs or None
+        field_pos : (N, 2) field coordinates in meters or None
+        """
+
+        bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+        n = len(bboxes)
+        if n == 0:
+            return
+
+        self._reserve(n)
+        rows = self._data[self._size:self._size + n]
+
+        rows["frame"] = frame
+        rows["track_id"] = -1 if track_ids is None else track_ids
+        rows["class_id"] = -1 if class_ids is None else class_ids
+        rows["conf"] = np.nan if confs is None else confs
+        rows["team"] = -1
+
+        for i, name in enumerate(BBOX_FIELDS):
+            rows[name] = bboxes[:, i]
+
+        if field_pos is None:
+            rows["fx"] = np.nan
+            rows["fy"] = np.nan
+        else:
+            field_pos = np.asarray(field_pos, dtype=np.float64).reshape(-1, 2)
+            rows["fx"] = field_pos[:, 0]
+            rows["fy"] = field_pos[:, 1]
+
+        self._size += n
+
+    def append(self, frame: int, bbox, conf: float = np.nan, class_id: int = -1, track_id: int = -1,
+               field_pos=None):
+        """
+        Append a single row.
+        """
+
+        self.append_frame(frame, [bbox], confs=conf, class_ids=class_id, track_ids=track_id,
+                          field_pos=None if field_pos is None else [field_pos])
+
+    def set_teams(self, labels: dict):
+        """
+        Write cached per-track team labels into every row of those tracks.
+
+        :param labels: {track_id: team label}; tracks not in it keep their current value
+        """
+
+        if not labels:
+            return
+
+        data = self.data
+        ids = np.fromiter(labels.keys(), dtype=np.int64, count=len(labels))
+        teams = np.fromiter(labels.values(), dtype=np.int8, count=len(labels))
+
+        order = np.argsort(ids)
+        ids, teams = ids[order], teams[order]
+
+        pos = np.clip(np.searchsorted(ids, data["track_id"]), 0, len(ids) - 1)
+        found = ids[pos] == data["track_id"]
+        data["team"][found] = teams[pos[found]]
+
+    def bboxes(self):
+        """
+        (N, 4) float32 copy of the box columns.
+        """
+        data = self.data
+        return np.stack([data[name] for name in BBOX_FIELDS], axis=1)
+
+    def frames(self):
+        """
+        Yield (frame, rows) for each frame present, in insertion order.
+        """
+
+        data = self.data
+        if len(data) == 0:
+            return
+
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(data["frame"])) + 1, [len(data)]))
+        for start, end in zip(starts[:-1], starts[1:]):
+            yield int(data["frame"][start]), data[start:end]
+
+    @staticmethod
+    def _to_record(row):
+        return Record(
+            frame=int(row["frame"]),
+            track_id=int(row["track_id"]),
+            class_id=int(row["class_id"]),
+            conf=float(row["conf"]),
+            bbox=(float(row["x1"]), float(row["y1"]), float(row["x2"]), float(row["y2"])),
+            field_pos=(float(row["fx"]), float(row["fy"])),
+            team=int(row["team"]),
+        )
+
+    # ==========================
+    # Persistence
+    # ==========================
+    def save(self, path: str):
+        np.save(path, self.data)
+
+    @classmethod
+    def load(cls, path: str):
+        data = np.load(path)
+        buffer = cls(capacity=len(data))
+        buffer._data[:len(data)] = data
+        buffer._size = len(data)
+        return buffer
+
+    def to_detection_json(self):
+        """
+        Legacy detections.json layout: one dict per detection.
+        """
+
+        data = self.data
+        bboxes = self.bboxes().astype(int).tolist()
+
+        return [
+            {
+                "frame": frame,
+                "class_id": class_id,
+                "confidence": conf,
+                "bbox": bbox
+            }
+            for frame, class_id, conf, bbox in zip(
+                data["frame"].tolist(), data["class_id"].tolist(),
+                np.round(data["conf"], CONF_DECIMALS).tolist(), bboxes
+            )
+        ]
+
+    def to_tracking_json(self, n_frames: int):
+        """
+        tracking_output.json layout: one entry per frame 0..n_frames-1, with a team label per track.
+        """
+
+        results = [{"frame_id": i, "tracks": []} for i in range(n_frames)]
+
+        for frame, rows in self.frames():
+            bboxes = np.stack([rows[name] for name in BBOX_FIELDS], axis=1).astype(int).tolist()
+            results[frame]["tracks"] = [
+                {"track_id": tid, "bbox": bbox, "team": team}
+                for tid, bbox, team in zip(rows["track_id"].tolist(), bboxes, rows["team"].tolist())
+            ]
+
+        return results
+
+    def to_field_json(self, n_frames: int):
+        """
+        tracking_field_coords.json layout: one entry per frame 0..n_frames-1, with a team label per track.
+        """
+
+        results = [{"frame_id": i, "field_tracks": []} for i in range(n_frames)]
+
+        for frame, rows in self.frames():
+            results[frame]["field_tracks"] = [
+                {"track_id": tid, "field_pos": [fx, fy], "team": team}
+                for tid, fx, fy, team in zip(
+                    rows["track_id"].tolist(), rows["fx"].tolist(), rows["fy"].tolist(), rows["team"].tolist()
+                )
+            ]
+
+        return results
@@ -0,0 +1,206 @@
+from collections import defaultdict
+import numpy as np
+import cv2
+
+TEAM_A = 0
+TEAM_B = 1
+REFEREE = 2
+UNKNOWN = -1
+
+TEAM_NAMES = {TEAM_A: "Team A", TEAM_B: "Team B", REFEREE: "Referee", UNKNOWN: "Unknown"}
+TEAM_COLORS = {TEAM_A: "tab:blue", TEAM_B: "tab:red", REFEREE: "gold", UNKNOWN: "tab:gray"}
+
+PATCH_SIZE = 16
+REFEREE_DISTANCE = 50.0   # min Lab distance (8-bit units) between all three kit colors for a referee cluster
+REFIT_GROWTH = 1.5        # refit once the number of classified tracks has grown by this factor
+
+# Torso region as fractions of the bbox (x1, y1, x2, y2): skips head, legs and the sides
+TORSO = (0.25, 0.2, 0.75, 0.5)
+
+
+def torso_patches(frame, bboxes, size: int = PATCH_SIZE):
+    """
+    Sample fixed-size torso patches for all boxes in a single cv2.remap call.
+
+    Parameters:
+    -----------
+    frame : HxWx3 BGR image
+    bboxes : (N, 4) array of [x1, y1, x2, y2]
+
+    Returns:
+    --------
+    (N, size, size, 3) uint8 array
+    """
+
+    bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+    n = len(bboxes)
+    if n == 0:
+        return np.empty((0, size, size, 3), dtype=np.uint8)
+
+    w = bboxes[:, 2] - bboxes[:, 0]
+    h = bboxes[:, 3] - bboxes[:, 1]
+    tx1 = bboxes[:, 0] + TORSO[0] * w
+    ty1 = bboxes[:, 1] + TORSO[1] * h
+    tx2 = bboxes[:, 0] + TORSO[2] * w
+    ty2 = bboxes[:, 1] + TORSO[3] * h
+
+    steps = (np.arange(size, dtype=np.float32) + 0.5) / size
+
+    # Sampling grid for every patch stacked vertically: (N * size, size)
+    map_x = tx1[:, None, None] + (tx2 - tx1)[:, None, None] * steps[None, None, :]
+    map_y = ty1[:, None, None] + (ty2 - ty1)[:, None, None] * steps[None, :, None]
+    map_x = np.broadcast_to(map_x, (n, size, size)).reshape(n * size, size)
+    map_y = np.broadcast_to(map_y, (n, size, size)).reshape(n * size, size)
+
+    patches = cv2.remap(frame, map_x.astype(np.float32), map_y.astype(np.float32),
+                        cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+    return patches.reshape(n, size, size, 3)
+
+
+def torso_colors(patches):
+    """
+    Mean CIELAB color of a batch of patches, ignoring grass-green pixels.
+
+    Lab distances are roughly perceptual, so slight shade variations of a kit stay
+    close while different kits are far apart (unlike hard-binned hue histograms,
+    where e.g. reds on both sides of the hue wrap-around share no bins).
+
+    Returns:
+    --------
+    (N, 3) float32 array of OpenCV 8-bit Lab values
+    """
+
+    n = len(patches)
+    if n == 0:
+        return np.empty((0, 3), dtype=np.float32)
+
+    size = patches.shape[1]
+    flat = patches.reshape(n * size, size, 3)
+    hsv = cv2.cvtColor(flat, cv2.COLOR_BGR2HSV).reshape(n, -1, 3)
+    lab = cv2.cvtColor(flat, cv2.COLOR_BGR2LAB).reshape(n, -1, 3).astype(np.float64)
+
+    # OpenCV hue is 0..179; pitch green is roughly 35..85 with some saturation
+    grass = (hsv[..., 0] >= 35) & (hsv[..., 0] <= 85) & (hsv[..., 1] > 60)
+    weights = (~grass).astype(np.float64)
+
+    # Patches that are all grass fall back to their plain mean
+    weights[weights.sum(axis=1) == 0] = 1.0
+
+    colors = (lab * weights[..., None]).sum(axis=1) / weights.sum(axis=1, keepdims=True)
+
+    return colors.astype(np.float32)
+
+
+def _kmeans(features, k):
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 50, 1e-4)
+    _, clusters, centers = cv2.kmeans(features, k, None, criteria, 5, cv2.KMEANS_PP_CENTERS)
+    return clusters.ravel(), centers
+
+
+class TeamClassifier:
+    """
+    Assign tracks to Team A / Team B / Referee by jersey color.
+
+    Features are only extracted for tracks that have no label yet. Once enough
+    tracks have min_samples features, their mean torso colors are clustered with
+    k-means. Three clusters are kept only if all three centers are at least
+    referee_distance apart, the smallest one being the referee(s); otherwise the
+    tracks are split into two teams and nobody is labelled Referee. Later tracks
+    are assigned to the nearest center, and the model is refit on all tracks
+    whenever their number has grown by refit_growth (team labels stay matched to
+    the previous centers). Labels are cached per track ID.
+    """
+
+    def __init__(self, min_samples: int = 5, min_tracks: int = 6,
+                 referee_distance: float = REFEREE_DISTANCE, refit_growth: float = REFIT_GROWTH):
+        self.min_samples = min_samples
+        self.min_tracks = min_tracks
+        self.referee_distance = referee_distance
+        self.refit_growth = refit_growth
+
+        self.labels = {}                 # track_id -> team label
+        self.centers = None              # (2 or 3, 3) Lab centers indexed by team label
+        self._samples = defaultdict(list)
+        self._features = {}              # track_id -> mean torso color of tracks with enough samples
+        self._fit_size = 0
+
+    def update(self, frame, bboxes, track_ids):
+        """
+        Collect features for unlabeled tracks of a frame and label them when possible.
+        """
+
+        track_ids = [int(tid) for tid in track_ids]
+        pending = [i for i, tid in enumerate(track_ids) if tid not in self.labels and tid not in self._features]
+        if not pending:
+            return
+
+        features = torso_colors(torso_patches(frame, np.asarray(bboxes).reshape(-1, 4)[pending]))
+
+        for i, feature in zip(pending, features):
+            samples = self._samples[track_ids[i]]
+            if len(samples) < self.min_samples:
+                samples.append(feature)
+
+        ready = [tid for tid, samples in self._samples.items() if len(samples) >= self.min_samples]
+        if not ready:
+            return
+
+        for tid in ready:
+            self._features[tid] = np.mean(self._samples.pop(tid), axis=0)
+
+        if self.centers is None:
+            if len(self._features) >= self.min_tracks:
+                self.fit()
+        elif len(self._features) >= self._fit_size * self.refit_growth:
+            self.fit()
+        else:
+            self._assign(ready)
+
+    def fit(self):
+        """
+        Cluster the features of all ready tracks and (re)label them.
+        """
+
+        track_ids = list(self._features)
+        features = np.stack([self._features[tid] for tid in track_ids]).astype(np.float32)
+
+        clusters, centers = _kmeans(features, 2)
+        order = np.argsort(-np.bincount(clusters, minlength=2), kind="stable")
+
+        if len(features) >= 3:
+            clusters3, centers3 = _kmeans(features, 3)
+            order3 = np.argsort(-np.bincount(clusters3, minlength=3), kind="stable")
+            gaps = np.linalg.norm(centers3[:, None] - centers3[None, :], axis=2)
+
+            # Referee cluster only if clearly separated from both teams (and the teams from each other)
+            if gaps[np.triu_indices(3, 1)].min() > self.referee_distance:
+                clusters, centers, order = clusters3, centers3, order3
+
+        remap = np.empty(len(order), dtype=np.int64)
+        remap[order] = np.arange(len(order))
+        centers = centers[order]
+
+        # Keep Team A / Team B identities stable across refits
+        if self.centers is not None:
+            same = np.linalg.norm(centers[:2] - self.centers[:2], axis=1).sum()
+            swapped = np.linalg.norm(centers[1::-1] - self.centers[:2], axis=1).sum()
+            if swapped < same:
+                centers[:2] = centers[1::-1].copy()
+                remap = np.where(remap < 2, 1 - remap, remap)
+
+        self.centers = centers
+        self._fit_size = len(track_ids)
+
+        for tid, cluster in zip(track_ids, clusters):
+            self.labels[tid] = int(remap[cluster])
+
+    def _assign(self, track_ids):
+        features = np.stack([self._features[tid] for tid in track_ids])
+        dists = ((features[:, None, :] - self.centers[None, :, :]) ** 2).sum(axis=2)
+
+        for tid, label in zip(track_ids, dists.argmin(axis=1)):
+            self.labels[tid] = int(label)
+
+    def label(self, track_id):
+        return self.labels.get(int(track_id), UNKNOWN)
@@ -1,147 +1,254 @@
 import cv2
 import os
 import json
-from ultralytics import YOLO
+import numpy as np
 from src.homography.field_mapping import FieldMapper
+from src.tracking.association import IoUTracker
+from src.tracking.records import RecordBuffer
+from src.tracking.teams import UNKNOWN, TeamClassifier
+from src.visualization.annotate_video import draw_boxes, draw_labels
+
+# TODO: Replace these with actual points from your video
+IMAGE_POINTS = [
+    (100, 200),     # top-left
+    (1800, 220),    # top-right
+    (150, 900),     # bottom-left
+    (1750, 880)     # bottom-right
+]
+
+# Real-world field coordinates in meters (FIFA 105x68)
+FIELD_POINTS = [
+    (0, 0),
+    (105, 0),
+    (0, 68),
+    (105, 68)
+]
+
+DEFAULT_FPS = 25  # used when the container does not report a frame rate
+
+
+def read_fps(cap) -> float:
+    """
+    Frame rate of an opened cv2.VideoCapture, DEFAULT_FPS if unknown.
+    """
+    return cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+
 
 class Tracker:
-    def __init__(self):
+    def __init__(self, render_video: bool = False, video_path: str = "data/raw/1.mp4",
+                 output_dir: str = "outputs", model=None,
+                 model_path: str = "models/detection/yolov8/yolov8m.pt",
+                 image_points=None, field_points=None, classify_teams: bool = True,
+                 backend: str = "bytetrack"):
+        """
+        :param render_video: draw tracks and encode an output video during tracking.
+            Off by default; use src.visualization.annotate_video to render saved tracks later.
+        :param video_path: input raw video
+        :param output_dir: folder for the JSON outputs (video goes to <output_dir>/videos)
+        :param model: already constructed model exposing ultralytics' track() API;
+            loaded from model_path when None
+        :param model_path: path to YOLOv8 weights
+        :param image_points: pixel calibration points (defaults to IMAGE_POINTS)
+        :param field_points: matching field points in meters (defaults to FIELD_POINTS)
+        :param classify_teams: label each track as Team A / Team B / Referee by jersey color
+        :param backend: "bytetrack" (ultralytics model.track) or "iou" (model.predict +
+            our vectorized IoUTracker, which scales to crowded frames)
+        """
+        if backend not in ("bytetrack", "iou"):
+            raise ValueError(f"Unknown tracker backend: {backend}")
+        self.backend = backend
+
         # Input raw video
-        self.video_path = "data/raw/1.mp4"  
+        self.video_path = video_path
 
         # Output paths
-        self.output_video_path = "outputs/videos/tracking_output.avi"  # use .avi on Windows
-        self.output_json_path = "outputs/tracking_output.json"
-        self.output_field_json = "outputs/tracking_field_coords.json"
+        self.output_video_path = os.path.join(output_dir, "videos", "tracking_output.avi")  # use .avi on Windows
+        self.output_json_path = os.path.join(output_dir, "tracking_output.json")
+        self.output_field_json = os.path.join(output_dir, "tracking_field_coords.json")
+        self.output_records_path = os.path.join(output_dir, "tracking_records.npy")
+        self.output_meta_path = os.path.join(output_dir, "tracking_meta.json")
+        self.render_video = render_video
 
-        os.makedirs("outputs/videos", exist_ok=True)
+        os.makedirs(os.path.join(output_dir, "videos"), exist_ok=True)
 
         # Load YOLOv8 medium (CPU-friendly)
-        self.model = YOLO("models/detection/yolov8/yolov8m.pt")
+        if model is None:
+            from ultralytics import YOLO
+            model = YOLO(model_path)
+        self.model = model
 
         # Initialize field mapper
         self.mapper = FieldMapper()
 
-        # TODO: Replace these with actual points from your video
-        image_points = [
-            (100, 200),     # top-left
-            (1800, 220),    # top-right
-            (150, 900),     # bottom-left
-            (1750, 880)     # bottom-right
-        ]
-
-        # Real-world field coordinates in meters (FIFA 105x68)
-        field_points = [
-            (0, 0),
-            (105, 0),
-            (0, 68),
-            (105, 68)
-        ]
+        # Filled by run(): structured array of all track observations, video frame rate
+        self.records = None
+        self.fps = None
+
+        self.classify_teams = classify_teams
+        self.team_classifier = None
+
+        image_points = IMAGE_POINTS if image_points is None else image_points
+        field_points = FIELD_POINTS if field_points is None else field_points
 
         self.mapper.set_correspondences(image_points, field_points)
 
-    def run(self):
+    def video_fps(self) -> float:
+        """
+        Frame rate of the input video (e.g. for StreamingAnalytics before run()).
+        """
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            return read_fps(cap) if cap.isOpened() else DEFAULT_FPS
+        finally:
+            cap.release()
+
+    def run(self, progress_callback=None, field_callback=None):
+        """
+        Track the whole video and save pixel and field JSON outputs.
+
+        :param progress_callback: optional callable(frames_done, total_frames),
+            called after every frame; raising from it aborts the run
+        :param field_callback: optional callable(frame_id, field_tracks) receiving each
+            frame's field tracks ([{"track_id", "field_pos", "team"}, ...]) as they are
+            produced, e.g. StreamingAnalytics.update
+        :return: True on success, False if the video could not be opened
+        """
         cap = cv2.VideoCapture(self.video_path)
         if not cap.isOpened():
             print(f"❌ Cannot open video: {self.video_path}")
-            return
+            return False
 
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = int(cap.get(cv2.CAP_PROP_FPS))
+        fps = read_fps(cap)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
-        # fallback if width/height/fps are zero
+        # fallback if width/height are zero
         if width == 0 or height == 0:
             width, height = 1280, 720
-        if fps == 0:
-            fps = 25
+        self.fps = fps
 
         print(f"Video info -> width: {width}, height: {height}, fps: {fps}")
 
         # Use XVID codec for Windows
-        out = cv2.VideoWriter(
-            self.output_video_path,
-            cv2.VideoWriter_fourcc(*"XVID"),
-            fps,
-            (width, height)
-        )
-
-        tracking_results = []
-        field_results = []
+        out = None
+        if self.render_video:
+            out = cv2.VideoWriter(
+                self.output_video_path,
+                cv2.VideoWriter_fourcc(*"XVID"),
+                fps,
+                (width, height)
+            )
+
+        records = RecordBuffer()
+        associator = IoUTracker() if self.backend == "iou" else None
+        self.team_classifier = TeamClassifier() if self.classify_teams else None
         frame_id = 0
 
         print("📹 Starting tracking...")
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            results = self.model.track(
-                frame,
-                persist=True,
-                tracker="bytetrack.yaml",
-                classes=[0]  # only person
-            )[0]
-
-            frame_tracks = []
-            frame_field = []
-
-            if results.boxes.id is not None:
-                boxes = results.boxes.xyxy.cpu().numpy()
-                ids = results.boxes.id.cpu().numpy()
-
-                for box, track_id in zip(boxes, ids):
-                    x1, y1, x2, y2 = map(int, box)
-                    track_id = int(track_id)
-
-                    # Draw bbox + ID
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0,255,0), 2)
-                    cv2.putText(frame,
-                                f"ID {track_id}",
-                                (x1, y1-10),
-                                cv2.FONT_HERSHEY_SIMPLEX,
-                                0.6, (0,255,0), 2)
-
-                    frame_tracks.append({
-                        "track_id": track_id,
-                        "bbox": [x1, y1, x2, y2]
-                    })
-
-                    # Map bbox to field coordinates
-                    field_x, field_y = self.mapper.map_bbox_to_field([x1, y1, x2, y2])
-                    frame_field.append({
-                        "track_id": track_id,
-                        "field_pos": [field_x, field_y]
-                    })
-
-            tracking_results.append({
-                "frame_id": frame_id,
-                "tracks": frame_tracks
-            })
-
-            field_results.append({
-                "frame_id": frame_id,
-                "field_tracks": frame_field
-            })
-
-            out.write(frame)
-            frame_id += 1
-
-        cap.release()
-        out.release()
-
-        # Save JSON outputs
+        # Release the capture/writer even when a callback aborts the run (e.g. job cancelled)
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                boxes = np.empty((0, 4), dtype=np.int32)
+                ids = np.empty(0, dtype=np.int32)
+                confs = np.empty(0, dtype=np.float32)
+                field_pos = np.empty((0, 2))
+
+                if associator is None:
+                    results = self.model.track(
+                        frame,
+                        persist=True,
+                        tracker="bytetrack.yaml",
+                        classes=[0]  # only person
+                    )[0]
+
+                    if results.boxes.id is not None:
+                        boxes = results.boxes.xyxy.cpu().numpy().astype(np.int32)
+                        ids = results.boxes.id.cpu().numpy().astype(np.int32)
+                        confs = results.boxes.conf.cpu().numpy()
+                else:
+                    # Keep low-score detections: IoUTracker uses them to recover tracks (ByteTrack-style)
+                    results = self.model.predict(frame, conf=associator.low_thresh, classes=[0], verbose=False)[0]
+                    det_boxes = results.boxes.xyxy.cpu().numpy()
+                    det_confs = results.boxes.conf.cpu().numpy()
+
+                    track_ids, det_idx = associator.update(det_boxes, det_confs)
+                    boxes = det_boxes[det_idx].astype(np.int32)
+                    ids = track_ids.astype(np.int32)
+                    confs = det_confs[det_idx]
+
+                if len(ids):
+                    # Map all bboxes of the frame to field coordinates at once
+                    field_pos = self.mapper.map_bboxes_to_field(boxes)
+
+                    records.append_frame(
+                        frame_id,
+                        boxes,
+                        confs=confs,
+                        class_ids=0,
+                        track_ids=ids,
+                        field_pos=field_pos
+                    )
+
+                    # Jersey colors of tracks not labelled yet (before any drawing on the frame)
+                    if self.team_classifier is not None:
+                        self.team_classifier.update(frame, boxes, ids)
+
+                # Draw bbox + ID (opt-in)
+                if out is not None:
+                    draw_boxes(frame, boxes)
+                    draw_labels(frame, boxes, [f"ID {tid}" for tid in ids.tolist()])
+                    out.write(frame)
+
+                # Stream this frame's field tracks (live team labels) to consumers
+                if field_callback is not None:
+                    label = self.team_classifier.label if self.team_classifier is not None else (lambda tid: UNKNOWN)
+                    field_callback(frame_id, [
+                        {"track_id": tid, "field_pos": [fx, fy], "team": label(tid)}
+                        for tid, (fx, fy) in zip(ids.tolist(), field_pos.tolist())
+                    ])
+
+                frame_id += 1
+
+                if progress_callback is not None:
+                    progress_callback(frame_id, total_frames)
+        finally:
+            cap.release()
+            if out is not None:
+                out.release()
+
+        # Backfill cached team labels into every observation of each track
+        if self.team_classifier is not None:
+            records.set_teams(self.team_classifier.labels)
+
+        self.records = records
+
+        # Save outputs: compact record array + legacy JSON layouts
+        records.save(self.output_records_path)
+
         with open(self.output_json_path, "w") as f:
-            json.dump(tracking_results, f, indent=4)
+            json.dump(records.to_tracking_json(frame_id), f)
 
         with open(self.output_field_json, "w") as f:
-            json.dump(field_results, f, indent=4)
+            json.dump(records.to_field_json(frame_id), f)
+
+        # Video properties needed downstream (analytics speeds/windows depend on fps)
+        with open(self.output_meta_path, "w") as f:
+            json.dump({"fps": fps, "width": width, "height": height, "frames": frame_id}, f)
 
         print("✅ Tracking complete!")
-        print("🎥 Video saved at:", self.output_video_path)
+        if out is not None:
+            print("🎥 Video saved at:", self.output_video_path)
         print("📄 JSON saved at:", self.output_json_path)
         print("📄 Field coordinates saved at:", self.output_field_json)
+        print("📄 Records saved at:", self.output_records_path)
+        print("📄 Video info saved at:", self.output_meta_path)
+        return True
 
 
 if __name__ == "__main__":
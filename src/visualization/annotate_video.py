@@ -0,0 +1,169 @@
+import json
+import shutil
+import subprocess
+import numpy as np
+import cv2
+from src.preprocessing.video_loader import VideoLoader
+
+VIDEO_PATH = "data/raw/1.mp4"
+JSON_PATH = "outputs/tracking_output.json"
+OUTPUT_PATH = "outputs/videos/tracking_annotated.mp4"
+
+BOX_COLOR = (0, 255, 0)
+BOX_THICKNESS = 2
+PRESET = "veryfast"   # libx264 preset: ultrafast ... veryslow
+CRF = 23
+
+
+def draw_boxes(frame, bboxes, color=BOX_COLOR, thickness=BOX_THICKNESS):
+    """
+    Draw rectangle outlines for all boxes of a frame with a single cv2.polylines call.
+
+    Parameters:
+    -----------
+    frame : HxWx3 uint8 image (modified in place)
+    bboxes : array-like of [x1, y1, x2, y2]
+    """
+
+    bboxes = np.asarray(bboxes, dtype=np.int32).reshape(-1, 4)
+    if len(bboxes) == 0:
+        return frame
+
+    x1, y1, x2, y2 = bboxes.T
+    rect_pts = np.stack([
+        np.stack([x1, y1], axis=1),
+        np.stack([x2, y1], axis=1),
+        np.stack([x2, y2], axis=1),
+        np.stack([x1, y2], axis=1),
+    ], axis=1)
+
+    cv2.polylines(frame, list(rect_pts), True, color, thickness)
+
+    return frame
+
+
+def draw_labels(frame, bboxes, labels, color=BOX_COLOR):
+    """
+    Draw a text label above each box.
+    """
+
+    for (x1, y1, _, _), label in zip(np.asarray(bboxes, dtype=np.int64).reshape(-1, 4), labels):
+        cv2.putText(frame,
+                    str(label),
+                    (int(x1), int(y1) - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6, color, 2)
+
+    return frame
+
+
+class FFmpegWriter:
+    """
+    Encodes raw BGR frames by piping them into an ffmpeg (libx264) subprocess.
+    """
+
+    def __init__(self, output_path: str, width: int, height: int, fps: float,
+                 preset: str = PRESET, crf: int = CRF):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("❌ ffmpeg executable not found on PATH.")
+
+        self.width = width
+        self.height = height
+
+        cmd = [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", "bgr24",
+            "-s", f"{width}x{height}",
+            "-r", str(fps),
+            "-i", "-",
+            "-an",
+            "-c:v", "libx264",
+            "-preset", preset,
+            "-crf", str(crf),
+            "-pix_fmt", "yuv420p",
+            output_path,
+        ]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        if frame.shape[1] != self.width or frame.shape[0] != self.height:
+            frame = cv2.resize(frame, (self.width, self.height))
+        self.proc.stdin.write(np.ascontiguousarray(frame).tobytes())
+
+    def release(self):
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"❌ ffmpeg exited with code {self.proc.returncode}")
+
+
+def load_tracks(json_path):
+    """
+    Load saved tracking output into a {frame_id: (bboxes, track_ids)} lookup.
+    """
+
+    with open(json_path, "r") as f:
+        data = json.load(f)
+
+    lookup = {}
+
+    for frame in data:
+        tracks = frame["tracks"]
+        bboxes = np.array([t["bbox"] for t in tracks], dtype=np.int64).reshape(-1, 4)
+        ids = [t["track_id"] for t in tracks]
+        lookup[frame["frame_id"]] = (bboxes, ids)
+
+    return lookup
+
+
+def annotate_video(video_path=VIDEO_PATH, json_path=JSON_PATH, output_path=OUTPUT_PATH,
+                   preset=PRESET, crf=CRF, labels=True):
+    """
+    Render saved tracks onto the source video and encode it with ffmpeg.
+
+    Parameters:
+    -----------
+    video_path : source video the tracks were computed on
+    json_path : tracking JSON written by Tracker.run
+    output_path : annotated video to write
+    preset : libx264 speed/size trade-off
+    labels : draw "ID n" labels in addition to boxes
+    """
+
+    tracks = load_tracks(json_path)
+
+    loader = VideoLoader(video_path)
+    cap = loader.load()
+
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25
+
+    writer = FFmpegWriter(output_path, width, height, fps, preset=preset, crf=crf)
+
+    frame_id = 0
+
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            if frame_id in tracks:
+                bboxes, ids = tracks[frame_id]
+                draw_boxes(frame, bboxes)
+                if labels:
+                    draw_labels(frame, bboxes, [f"ID {tid}" for tid in ids])
+
+            writer.write(frame)
+            frame_id += 1
+    finally:
+        cap.release()
+        writer.release()
+
+    print(f"🎥 Annotated video saved at: {output_path}")
+
+
+if __name__ == "__main__":
+    annotate_video()
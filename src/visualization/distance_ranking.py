@@ -2,10 +2,14 @@ import json
 import numpy as np
 import matplotlib.pyplot as plt
 from collections import defaultdict
+import matplotlib.patches as mpatches
+from src.tracking.teams import REFEREE, TEAM_COLORS, TEAM_NAMES, UNKNOWN
 
 JSON_PATH = "outputs/tracking_field_coords.json"
 OUTPUT_PATH = "outputs/distance_ranking.png"
 
+EXCLUDE_REFEREES = True
+
 
 def calculate_distance(coords):
     coords = np.array(coords)
@@ -19,16 +23,20 @@ def generate_ranking():
         data = json.load(f)
 
     tracks = defaultdict(list)
+    teams = {}
 
     for frame in data:
         for obj in frame["field_tracks"]:
             track_id = obj["track_id"]
             x, y = obj["field_pos"]
             tracks[track_id].append((x, y))
+            teams[track_id] = obj.get("team", UNKNOWN)
 
     distances = {}
 
     for tid, coords in tracks.items():
+        if EXCLUDE_REFEREES and teams[tid] == REFEREE:
+            continue
         if len(coords) > 300:
             distances[tid] = calculate_distance(coords)
 
@@ -40,9 +48,14 @@ def generate_ranking():
 
     ids = [str(x[0]) for x in sorted_dist]
     values = [x[1] for x in sorted_dist]
+    colors = [TEAM_COLORS[teams[x[0]]] for x in sorted_dist]
 
     plt.figure(figsize=(10, 6))
-    plt.bar(ids, values)
+    plt.bar(ids, values, color=colors)
+    plt.legend(handles=[
+        mpatches.Patch(color=TEAM_COLORS[team], label=TEAM_NAMES[team])
+        for team in sorted({teams[x[0]] for x in sorted_dist})
+    ])
     plt.xlabel("Track ID")
     plt.ylabel("Distance (meters)")
     plt.title("Top 10 Distance Covered")
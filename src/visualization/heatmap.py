@@ -4,6 +4,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from collections import defaultdict
 from scipy.ndimage import gaussian_filter
+from src.tracking.teams import TEAM_NAMES, UNKNOWN
 
 JSON_PATH = "outputs/tracking_field_coords.json"
 OUTPUT_DIR = "outputs/heatmaps"
@@ -46,12 +47,14 @@ def generate_heatmaps():
         data = json.load(f)
 
     tracks = defaultdict(list)
+    teams = {}
 
     for frame in data:
         for obj in frame["field_tracks"]:
             tid = obj["track_id"]
             x, y = obj["field_pos"]
             tracks[tid].append((x, y))
+            teams[tid] = obj.get("team", UNKNOWN)
 
     # filter stable tracks
     tracks = {
@@ -96,7 +99,7 @@ def generate_heatmaps():
             alpha=0.8
         )
 
-        plt.title(f"Heatmap - Player ID {tid}")
+        plt.title(f"Heatmap - Player ID {tid} ({TEAM_NAMES[teams[tid]]})")
 
         save_path = os.path.join(OUTPUT_DIR, f"heatmap_ID_{tid}.png")
         plt.savefig(save_path, dpi=300)
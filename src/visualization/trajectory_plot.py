@@ -5,6 +5,7 @@ import matplotlib.pyplot as plt
 from collections import defaultdict
 import matplotlib.cm as cm
 import matplotlib.lines as mlines
+from src.tracking.teams import TEAM_NAMES, UNKNOWN
 
 
 JSON_PATH = "outputs/tracking_field_coords.json"
@@ -67,12 +68,14 @@ def plot_trajectories():
         data = json.load(f)
 
     tracks = defaultdict(list)
+    teams = {}
 
     for frame in data:
         for obj in frame["field_tracks"]:
             track_id = obj["track_id"]
             x, y = obj["field_pos"]
             tracks[track_id].append((x, y))
+            teams[track_id] = obj.get("team", UNKNOWN)
 
     tracks = {
         tid: coords
@@ -109,7 +112,7 @@ def plot_trajectories():
         legend_handles.append(
             mlines.Line2D([], [],
                           color=color,
-                          label=f"ID {track_id} ({distance:.1f}m)")
+                          label=f"ID {track_id} - {TEAM_NAMES[teams[track_id]]} ({distance:.1f}m)")
         )
 
     ax.legend(handles=legend_handles,
@@ -0,0 +1,233 @@
+import os
+import time
+import numpy as np
+import cv2
+
+WIDTH = 960
+HEIGHT = 540
+FPS = 25
+
+# Camera view of the full pitch (trapezoid: far touchline is shorter)
+IMAGE_POINTS = [(120, 60), (840, 60), (0, 520), (960, 520)]
+FIELD_POINTS = [(0, 0), (105, 0), (0, 68), (105, 68)]
+
+BOX_WIDTH = 14
+BOX_HEIGHT = 36
+
+GRASS = (60, 150, 60)
+KITS = {0: (40, 40, 200), 1: (200, 60, 30), 2: (0, 220, 230)}   # Team A, Team B, Referee (BGR)
+
+
+def _bounce(x, lo, hi):
+    """
+    Reflect positions back into [lo, hi] (players turn at the touchlines).
+    """
+    span = hi - lo
+    m = np.mod(x - lo, 2 * span)
+    return lo + np.where(m <= span, m, 2 * span - m)
+
+
+class SyntheticMatch:
+    """
+    Ground-truth sequence: players moving at constant speed on a 105x68 pitch,
+    projected into the image with a known homography.
+
+    The last player is the referee; the others alternate between the two teams.
+    Positions are analytic in frame_id, so any frame can be generated on its own.
+    """
+
+    def __init__(self, n_players=6, width=WIDTH, height=HEIGHT, fps=FPS, seed=0):
+        self.n_players = n_players
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self.start = np.stack([rng.uniform(10, 95, n_players), rng.uniform(8, 60, n_players)], axis=1)
+        self.velocity = rng.uniform(-6, 6, (n_players, 2))    # m/s
+
+        self.track_ids = np.arange(1, n_players + 1)
+        self.teams = np.arange(n_players) % 2
+        self.teams[-1] = 2
+
+        sx, sy = width / WIDTH, height / HEIGHT
+        self.image_points = [(x * sx, y * sy) for x, y in IMAGE_POINTS]
+        self.field_points = FIELD_POINTS
+        self.H_field_to_image = cv2.getPerspectiveTransform(
+            np.array(FIELD_POINTS, dtype=np.float32), np.array(self.image_points, dtype=np.float32)
+        )
+
+    def field_positions(self, frame_id):
+        """
+        (N, 2) true field positions in meters.
+        """
+        pos = self.start + self.velocity * (frame_id / self.fps)
+        return np.stack([_bounce(pos[:, 0], 0, 105), _bounce(pos[:, 1], 0, 68)], axis=1)
+
+    def boxes(self, frame_id):
+        """
+        Ground-truth (bboxes (N, 4), track_ids (N,)) with the feet at the bottom-center.
+        """
+        feet = cv2.perspectiveTransform(
+            self.field_positions(frame_id).reshape(-1, 1, 2), self.H_field_to_image
+        ).reshape(-1, 2)
+
+        bboxes = np.stack([
+            feet[:, 0] - BOX_WIDTH / 2,
+            feet[:, 1] - BOX_HEIGHT,
+            feet[:, 0] + BOX_WIDTH / 2,
+            feet[:, 1],
+        ], axis=1)
+
+        return bboxes, self.track_ids.copy()
+
+    def gt_frames(self, n_frames):
+        """
+        {frame_id: (track_ids, bboxes)} for evaluation with mot_metrics.
+        """
+        frames = {}
+        for frame_id in range(n_frames):
+            bboxes, ids = self.boxes(frame_id)
+            frames[frame_id] = (ids, bboxes)
+        return frames
+
+    def render(self, frame_id):
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        frame[:] = GRASS
+
+        bboxes, _ = self.boxes(frame_id)
+        for (x1, y1, x2, y2), team in zip(bboxes.astype(int), self.teams):
+            frame[max(y1, 0):max(y2, 0), max(x1, 0):max(x2, 0)] = KITS[team]
+
+        return frame
+
+    def write(self, path, n_frames):
+        """
+        Render the sequence to an MJPG .avi file.
+        """
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), self.fps, (self.width, self.height))
+        for frame_id in range(n_frames):
+            writer.write(self.render(frame_id))
+        writer.release()
+        return path
+
+
+def write_clip(path, n_frames=20, n_players=6, width=WIDTH, height=HEIGHT):
+    return SyntheticMatch(n_players, width, height).write(path, n_frames)
+
+
+class _Tensor:
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class _Boxes:
+    def __init__(self, bboxes, ids):
+        self.xyxy = _Tensor(bboxes)
+        self.id = None if ids is None else _Tensor(ids.astype(float))
+        self.conf = _Tensor(np.full(len(bboxes), 0.9))
+        self.cls = _Tensor(np.zeros(len(bboxes)))
+
+
+class _Results:
+    def __init__(self, bboxes, ids):
+        self.boxes = _Boxes(bboxes, ids)
+
+
+class StubDetector:
+    """
+    Offline stand-in for an ultralytics YOLO detector: predict() returns the
+    ground-truth boxes of the synthetic match for each successive frame,
+    shuffled and without IDs, so identities must come from the tracker's own
+    association (Tracker(backend="iou")).
+
+    :param drop_every: drop player (frame_id % n_players) on every nth frame (0 = never)
+    :param delay: seconds to sleep per frame (simulates a slow model)
+    :param fail: raise on the first frame
+    """
+
+    def __init__(self, n_players=6, seed=0, drop_every=0, delay=0.0, fail=False):
+        self.n_players = n_players
+        self.seed = seed
+        self.drop_every = drop_every
+        self.delay = delay
+        self.fail = fail
+        self.match = None
+        self.frame_id = 0
+        self.conf = None              # confidence threshold of the last predict() call
+
+    def predict(self, frame, conf=None, classes=None, verbose=False):
+        self.conf = conf
+        if self.fail:
+            raise RuntimeError("stub detector failure")
+        if self.delay:
+            time.sleep(self.delay)
+
+        if self.match is None:
+            self.match = SyntheticMatch(self.n_players, frame.shape[1], frame.shape[0], seed=self.seed)
+
+        bboxes, _ = self.match.boxes(self.frame_id)
+        keep = np.ones(len(bboxes), dtype=bool)
+        if self.drop_every and self.frame_id % self.drop_every == 0:
+            keep[self.frame_id % self.n_players] = False
+
+        self.frame_id += 1
+        bboxes = bboxes[keep]
+        order = np.random.default_rng(self.frame_id).permutation(len(bboxes))
+        return [_Results(bboxes[order], None)]
+
+
+def stub_loader(config):
+    """
+    JobService model_loader for tests: a StubDetector built from config["stub"].
+
+    With config["crash_marker"] set, the first worker to load the model creates that
+    file and kills its own process, simulating a segfault/OOM kill.
+    """
+    marker = config.get("crash_marker")
+    if marker and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return StubDetector(**config.get("stub", {}))
+
+
+class StubBlobModel:
+    """
+    Offline stand-in for an ultralytics YOLO predict() model: every bright blob of
+    at least min_area pixels in an image is a detection. Blobs shrink with the
+    resize, so small distant players are only found at full resolution. With
+    by_level=True, pixels of different brightness belong to different blobs, so
+    overlapping players drawn with distinct gray levels are detected separately
+    (lossless frames only: compression noise splits the levels).
+
+    Records the image sizes of each predict() call in self.calls.
+    """
+
+    def __init__(self, min_area=60, by_level=False):
+        self.min_area = min_area
+        self.by_level = by_level
+        self.calls = []
+
+    def _detect(self, image):
+        gray = image if image.ndim == 2 else image.max(axis=2)
+        masks = [gray == level for level in np.unique(gray[gray > 127])] if self.by_level else [gray > 127]
+        stats = [np.empty((0, 5), dtype=np.int32)]
+        for mask in masks:
+            n, _, mask_stats, _ = cv2.connectedComponentsWithStats(mask.astype(np.uint8))
+            stats.append(mask_stats[1:n])
+        stats = np.concatenate(stats)
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= self.min_area]
+        x, y, w, h = (stats[:, i].astype(float) for i in range(4))
+        return _Results(np.stack([x, y, x + w, y + h], axis=1).reshape(-1, 4), None)
+
+    def predict(self, source, conf=None, classes=None, verbose=False):
+        images = source if isinstance(source, list) else [source]
+        self.calls.append([image.shape[:2] for image in images])
+        return [self._detect(image) for image in images]
@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import cv2
+import numpy as np
+import pytest
+from src.detection.detector import PlayerDetectorCPU
+from src.tracking.tracker import Tracker
+from src.visualization import annotate_video as av
+from synthetic import SyntheticMatch, StubBlobModel, StubDetector
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def test_draw_boxes_outlines_only():
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    av.draw_boxes(frame, [[10, 10, 50, 60]], color=(0, 255, 0), thickness=2)
+
+    assert (frame[10, 30] == (0, 255, 0)).all()      # top edge
+    assert (frame[60, 30] == (0, 255, 0)).all()      # bottom edge
+    assert (frame[35, 10] == (0, 255, 0)).all()      # left edge
+    assert (frame[35, 30] == 0).all()                # interior untouched
+    assert (frame[80, 80] == 0).all()                # outside untouched
+
+    assert av.draw_boxes(frame.copy(), np.empty((0, 4))).shape == frame.shape
+
+
+def test_load_tracks_builds_frame_lookup(tmp_path):
+    path = tmp_path / "tracks.json"
+    path.write_text(json.dumps([
+        {"frame_id": 0, "tracks": [{"track_id": 3, "bbox": [1, 2, 3, 4]}]},
+        {"frame_id": 1, "tracks": []},
+    ]))
+
+    tracks = av.load_tracks(str(path))
+
+    assert tracks[0][0].tolist() == [[1, 2, 3, 4]] and tracks[0][1] == [3]
+    assert tracks[1][0].shape == (0, 4)
+
+
+def test_ffmpeg_writer_requires_ffmpeg(tmp_path, monkeypatch):
+    monkeypatch.setattr(av.shutil, "which", lambda name: None)
+    with pytest.raises(RuntimeError):
+        av.FFmpegWriter(str(tmp_path / "out.mp4"), 64, 48, 25)
+
+
+@needs_ffmpeg
+def test_annotate_video_encodes_every_frame(tmp_path):
+    match = SyntheticMatch(n_players=4, width=320, height=180)
+    video = match.write(str(tmp_path / "match.avi"), 10)
+
+    tracks = []
+    for frame_id in range(10):
+        bboxes, ids = match.boxes(frame_id)
+        tracks.append({"frame_id": frame_id, "tracks": [
+            {"track_id": tid, "bbox": bbox} for tid, bbox in zip(ids.tolist(), bboxes.astype(int).tolist())
+        ]})
+    json_path = tmp_path / "tracks.json"
+    json_path.write_text(json.dumps(tracks))
+
+    output = str(tmp_path / "annotated.mp4")
+    av.annotate_video(video, str(json_path), output, preset="ultrafast")
+
+    cap = cv2.VideoCapture(output)
+    n_frames = 0
+    while cap.read()[0]:
+        n_frames += 1
+    cap.release()
+    assert n_frames == 10
+
+
+def test_tracker_writes_no_video_by_default(tmp_path):
+    match = SyntheticMatch(n_players=4)
+    video = match.write(str(tmp_path / "match.avi"), 5)
+    tracker = Tracker(video_path=video, output_dir=str(tmp_path / "out"), model=StubDetector(4),
+                      image_points=match.image_points, field_points=match.field_points, backend="iou")
+
+    assert tracker.run()
+    assert os.path.exists(tracker.output_json_path)
+    assert not os.path.exists(tracker.output_video_path)
+
+
+def test_detector_writes_no_video_by_default(tmp_path):
+    video = SyntheticMatch(n_players=4).write(str(tmp_path / "match.avi"), 3)
+    detector = PlayerDetectorCPU(model_path=None, output_dir=str(tmp_path / "out"), skip_frames=1,
+                                 model=StubBlobModel())
+
+    detector.detect_video(video)
+
+    assert sorted(os.listdir(tmp_path / "out")) == ["detections.json", "detections.npy"]
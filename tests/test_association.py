@@ -0,0 +1,77 @@
+import numpy as np
+from src.tracking.association import IoUTracker, associate, iou_matrix
+
+
+def random_boxes(rng, n, width=3840, height=2160):
+    xy = rng.uniform(0, [width - 20, height - 50], (n, 2))
+    return np.hstack([xy, xy + rng.uniform([10, 30], [20, 50], (n, 2))])
+
+
+def test_iou_matrix_known_values():
+    a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]])
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [100, 100, 110, 110]])
+
+    iou = iou_matrix(a, b)
+
+    assert iou.shape == (2, 3)
+    assert np.allclose(iou[0], [1.0, 50 / 150, 0.0])
+    assert np.allclose(iou[1], 0.0)
+    assert iou_matrix(np.empty((0, 4)), b).shape == (0, 3)
+
+
+def test_bucketed_association_matches_dense():
+    rng = np.random.default_rng(0)
+
+    for n in (0, 1, 50, 400):
+        tracks = random_boxes(rng, n)
+        dets = tracks[rng.permutation(n)] + rng.normal(0, 2, (n, 4))
+        dets = np.vstack([dets, random_boxes(rng, 5)])      # unmatched extras
+
+        dense = associate(tracks, dets, spatial_buckets=False)
+        bucketed = associate(tracks, dets, spatial_buckets=True)
+
+        key = lambda m: m[np.lexsort((m[:, 1], m[:, 0]))]
+        assert np.array_equal(key(dense[0]), key(bucketed[0]))
+        assert np.array_equal(dense[1], bucketed[1])
+        assert np.array_equal(dense[2], bucketed[2])
+        assert len(dense[0]) + len(dense[2]) == len(dets)
+
+
+def test_iou_tracker_keeps_ids_through_shuffles_and_gaps():
+    rng = np.random.default_rng(1)
+    n = 300
+    boxes = random_boxes(rng, n)
+    velocity = rng.normal(0, 1.5, (n, 2))
+    tracker = IoUTracker(spatial_buckets=True)
+
+    truth_to_id = {}
+    for frame in range(30):
+        boxes = boxes + np.hstack([velocity, velocity])
+        keep = np.ones(n, dtype=bool)
+        if frame % 4 == 3:
+            keep[: n // 10] = False              # a tenth of the players missed
+        order = rng.permutation(np.flatnonzero(keep))
+
+        ids, det_idx = tracker.update(boxes[order], np.full(len(order), 0.9))
+
+        assert len(ids) == len(order)
+        for truth, tid in zip(order[det_idx].tolist(), ids.tolist()):
+            assert truth_to_id.setdefault(truth, tid) == tid
+
+    assert len(set(truth_to_id.values())) == n
+
+
+def test_iou_tracker_velocity_across_dropped_frame():
+    # 5 px/frame to the right, detection missing on frame 3
+    tracker = IoUTracker(velocity_smoothing=1.0)
+    for frame_id in range(5):
+        x = 100 + 5 * frame_id
+        if frame_id == 3:
+            ids, _ = tracker.update(np.empty((0, 4)), [])
+            assert len(ids) == 0
+            continue
+        ids, _ = tracker.update([[x, 100, x + 20, 160]], [0.9])
+        assert list(ids) == [1]
+
+    assert np.allclose(tracker.velocity, [[5, 0, 5, 0]])
+
@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+from src.detection.detector import PlayerDetectorCPU
+from src.detection.tiling import select_tiles
+from synthetic import StubBlobModel
+
+NEAR = (200, 200, 300, 400)        # large player, found in the resized pass too
+FAR = (1500, 800, 1512, 830)       # 12x30 px: below min_area once resized to 640 wide
+
+
+def player_frame(width=1920, height=1080, boxes=(NEAR, FAR), levels=None):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    for (x1, y1, x2, y2), level in zip(boxes, levels or [255] * len(boxes)):
+        frame[y1:y2, x1:x2] = level
+    return frame
+
+
+def make_detector(tmp_path, model=None, **kwargs):
+    return PlayerDetectorCPU(model_path=None, output_dir=str(tmp_path), skip_frames=1, resize_width=640,
+                             tile_size=640, model=model or StubBlobModel(), **kwargs)
+
+
+def resized_pass(detector, frame):
+    scale = detector.resize_width / frame.shape[1]
+    resized = cv2.resize(frame, (detector.resize_width, int(frame.shape[0] * scale)),
+                         interpolation=cv2.INTER_NEAREST)
+    res = detector.model.predict(resized)[0]
+    return scale, res.boxes.xyxy.numpy(), res.boxes.conf.numpy(), res.boxes.cls.numpy()
+
+
+def test_detect_tiles_adds_small_players_in_resized_coordinates(tmp_path):
+    detector = make_detector(tmp_path)
+    frame = player_frame()
+    scale, bboxes, confs, class_ids = resized_pass(detector, frame)
+    assert len(bboxes) == 1       # FAR is too small at 640 px
+
+    merged, _, _ = detector.detect_tiles(frame, scale, bboxes, confs, class_ids)
+
+    expected = np.array([NEAR, FAR], dtype=float) * scale
+    order = np.argsort(merged[:, 0])
+    assert merged.shape == (2, 4)
+    assert np.allclose(merged[order], expected, atol=1.0)
+
+    # Last-seen boxes are kept in full-resolution coordinates
+    assert np.allclose(np.sort(detector._last_boxes[:, 0]), [NEAR[0], FAR[0]], atol=3.0)
+
+
+def test_detect_tiles_keeps_overlapping_players(tmp_path):
+    # IoU 0.44 but IoS 0.61, straddling the border of the first tile (x = 640)
+    left, right = (600, 200, 700, 400), (630, 225, 730, 425)
+    detector = make_detector(tmp_path, model=StubBlobModel(by_level=True))
+    frame = player_frame(boxes=(left, right), levels=(200, 255))
+    scale, bboxes, confs, class_ids = resized_pass(detector, frame)
+    assert len(bboxes) == 2
+
+    merged, _, _ = detector.detect_tiles(frame, scale, bboxes, confs, class_ids)
+
+    expected = np.array([left, right], dtype=float) * scale
+    order = np.argsort(merged[:, 0])
+    assert merged.shape == (2, 4)
+    assert np.allclose(merged[order], expected, atol=1.0)
+
+
+def test_detect_tiles_adaptive_selection_and_refresh(tmp_path):
+    detector = make_detector(tmp_path, full_refresh=3)
+    frame = player_frame()
+    scale, bboxes, confs, class_ids = resized_pass(detector, frame)
+
+    n_tiles = []
+    for _ in range(4):
+        detector.detect_tiles(frame, scale, bboxes, confs, class_ids)
+        n_tiles.append(len(detector.model.calls[-1]))
+
+    seen = select_tiles(detector._tiles, frame.shape, last_boxes=detector._last_boxes).sum()
+    assert n_tiles == [len(detector._tiles), seen, seen, len(detector._tiles)]
+    assert seen < len(detector._tiles)
+
+
+def test_detect_video_resets_tile_state(tmp_path):
+    def write(path, width, height):
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 25, (width, height))
+        for _ in range(3):
+            writer.write(player_frame(width, height, boxes=[(100, 100, 160, 220)]))
+        writer.release()
+        return str(path)
+
+    detector = make_detector(tmp_path)
+    detector.detect_video(write(tmp_path / "wide.avi", 1920, 1080))
+    assert detector._tiles[:, 2].max() == 1920
+
+    records = detector.detect_video(write(tmp_path / "small.avi", 960, 540))
+    assert detector._tiles[:, 2].max() == 960
+    assert detector._tiled_frames == 3
+    assert len(records) == 3
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import sys
+import types
+import urllib.error
+import urllib.request
+import cv2
+import pytest
+from src.jobs import pipeline
+from src.jobs.pipeline import JobCancelled
+from src.jobs.server import JobService
+from src.jobs.store import JobStore
+from src.tracking.tracker import Tracker
+from synthetic import StubDetector, SyntheticMatch, stub_loader, write_clip
+
+STUB = {"tracker_backend": "iou"}
+
+
+def http(port, method, path, payload=None, headers=None):
+    data = None if payload is None else json.dumps(payload).encode()
+    headers = {"Content-Type": "application/json", **(headers or {})}
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+async def wait_for(port, job_id, statuses, timeout=60):
+    for _ in range(int(timeout / 0.1)):
+        _, job = await asyncio.to_thread(http, port, "GET", f"/jobs/{job_id}")
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.1)
+    raise AssertionError(f"job {job_id} stuck in {job['status']}")
+
+
+def run_service(tmp_path, scenario, **kwargs):
+    async def main():
+        service = JobService(db_path=str(tmp_path / "jobs.db"), work_dir=str(tmp_path / "jobs"),
+                             port=0, poll_interval=0.05, model_loader=stub_loader, **kwargs)
+        await service.start()
+        try:
+            return await scenario(service.port)
+        finally:
+            await service.stop()
+
+    return asyncio.run(main())
+
+
+def test_job_runs_all_stages(tmp_path):
+    video = write_clip(str(tmp_path / "clip.avi"), n_frames=20)
+
+    async def scenario(port):
+        status, body = await asyncio.to_thread(http, port, "POST", "/jobs",
+                                               {"video_path": video, "config": STUB})
+        assert status == 201
+        return await wait_for(port, body["id"], {"done", "failed"})
+
+    job = run_service(tmp_path, scenario)
+
+    assert job["status"] == "done", job["error"]
+    assert job["stage"] == "analytics"
+    with open(tmp_path / "jobs" / f"job_{job['id']}" / "analytics.json") as f:
+        distances = json.load(f)["distances"]
+    assert set(distances) == {str(tid) for tid in range(1, 7)}
+
+
+def test_failed_job_is_retried(tmp_path):
+    video = write_clip(str(tmp_path / "clip.avi"), n_frames=5)
+    config = dict(STUB, stub={"fail": True})
+
+    async def scenario(port):
+        _, body = await asyncio.to_thread(http, port, "POST", "/jobs",
+                                          {"video_path": video, "config": config, "max_retries": 2})
+        return await wait_for(port, body["id"], {"done", "failed"})
+
+    job = run_service(tmp_path, scenario)
+
+    assert job["status"] == "failed"
+    assert job["attempts"] == 3
+    assert "stub detector failure" in job["error"]
+
+
+def test_cancel_running_and_queued_jobs(tmp_path):
+    video = write_clip(str(tmp_path / "clip.avi"), n_frames=200)
+    config = dict(STUB, stub={"delay": 0.02})
+
+    async def scenario(port):
+        _, first = await asyncio.to_thread(http, port, "POST", "/jobs", {"video_path": video, "config": config})
+        _, second = await asyncio.to_thread(http, port, "POST", "/jobs", {"video_path": video, "config": config})
+        await wait_for(port, first["id"], {"running"})
+
+        status, _ = await asyncio.to_thread(http, port, "POST", f"/jobs/{second['id']}/cancel")
+        assert status == 200
+        status, _ = await asyncio.to_thread(http, port, "POST", f"/jobs/{first['id']}/cancel")
+        assert status == 200
+
+        return (await wait_for(port, first["id"], {"cancelled", "done", "failed"}),
+                await wait_for(port, second["id"], {"cancelled", "done", "failed"}))
+
+    first, second = run_service(tmp_path, scenario, workers=1)
+
+    assert first["status"] == "cancelled"
+    assert second["status"] == "cancelled"
+    assert second["attempts"] == 0
+
+
+def test_worker_crash_replaces_pool_and_requeues(tmp_path):
+    video = write_clip(str(tmp_path / "clip.avi"), n_frames=5)
+    config = dict(STUB, crash_marker=str(tmp_path / "crashed"))
+
+    async def scenario(port):
+        _, body = await asyncio.to_thread(http, port, "POST", "/jobs",
+                                          {"video_path": video, "config": config, "max_retries": 1})
+        return await wait_for(port, body["id"], {"done", "failed"})
+
+    job = run_service(tmp_path, scenario)
+
+    assert (tmp_path / "crashed").exists()
+    assert job["status"] == "done", job["error"]
+    assert job["attempts"] == 2
+
+
+def test_scheduler_survives_store_errors(tmp_path, monkeypatch):
+    video = write_clip(str(tmp_path / "clip.avi"), n_frames=5)
+    claim_next = JobStore.claim_next
+    errors = []
+
+    def flaky_claim_next(self):
+        if not errors:
+            errors.append(1)
+            raise RuntimeError("database is locked")
+        return claim_next(self)
+
+    monkeypatch.setattr(JobStore, "claim_next", flaky_claim_next)
+
+    async def scenario(port):
+        _, body = await asyncio.to_thread(http, port, "POST", "/jobs", {"video_path": video, "config": STUB})
+        return await wait_for(port, body["id"], {"done", "failed"})
+
+    job = run_service(tmp_path, scenario)
+
+    assert errors
+    assert job["status"] == "done", job["error"]
+
+
+def test_http_rejects_non_json_and_cross_origin_posts(tmp_path):
+    payload = {"video_path": "clip.avi", "config": STUB}
+
+    async def scenario(port):
+        plain = await asyncio.to_thread(http, port, "POST", "/jobs", payload, {"Content-Type": "text/plain"})
+        foreign = await asyncio.to_thread(http, port, "POST", "/jobs", payload, {"Origin": "http://evil.example"})
+        listed = await asyncio.to_thread(http, port, "GET", "/jobs")
+        return plain, foreign, listed
+
+    plain, foreign, listed = run_service(tmp_path, scenario)
+
+    assert plain[0] == 415
+    assert foreign[0] == 403
+    assert listed == (200, [])
+
+
+def test_job_config_cannot_choose_the_model_code(monkeypatch):
+    loaded = []
+    fake_ultralytics = types.ModuleType("ultralytics")
+    fake_ultralytics.YOLO = lambda path: loaded.append(path) or StubDetector()
+    monkeypatch.setitem(sys.modules, "ultralytics", fake_ultralytics)
+
+    config = {"model_factory": "os:system", "model_kwargs": {"command": "echo pwned"}}
+    pipeline.load_model(config)
+
+    assert loaded == ["models/detection/yolov8/yolov8m.pt"]
+
+
+def test_analytics_uses_tracked_video_fps(tmp_path, monkeypatch):
+    video = SyntheticMatch(fps=10).write(str(tmp_path / "clip.avi"), n_frames=20)
+    output_dir = str(tmp_path / "out")
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.submit(video, STUB)
+
+    assert Tracker(video_path=video, output_dir=output_dir, model=StubDetector()).video_fps() == 10
+
+    pipeline.run_tracking(store, job_id, video, STUB, output_dir, stub_loader)
+    with open(tmp_path / "out" / "tracking_meta.json") as f:
+        meta = json.load(f)
+    assert meta["fps"] == 10 and meta["frames"] == 20
+
+    fps_used = []
+    monkeypatch.setattr(pipeline, "batch_compute", lambda data, fps: fps_used.append(fps) or {})
+    pipeline.run_analytics(store, job_id, video, STUB, output_dir)
+    assert fps_used == [10]
+
+
+def test_interrupted_jobs_are_requeued(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.submit("clip.avi")
+    store.claim_next()
+
+    assert store.recover() == 1
+    job = store.get(job_id)
+    assert job["status"] == "queued"
+    assert job["attempts"] == 0
+
+
+def test_cancelled_tracking_releases_capture(tmp_path, monkeypatch):
+    opened = []
+
+    video_capture = cv2.VideoCapture
+
+    class RecordingCapture:
+        # Wraps instead of subclassing: Python subclasses of cv2.VideoCapture are not safe
+        def __init__(self, *args):
+            self.cap = video_capture(*args)
+            self.released = False
+            opened.append(self)
+
+        def __getattr__(self, name):
+            return getattr(self.cap, name)
+
+        def release(self):
+            self.released = True
+            self.cap.release()
+
+    monkeypatch.setattr(cv2, "VideoCapture", RecordingCapture)
+
+    def cancel(done, total):
+        raise JobCancelled(1)
+
+    tracker = Tracker(video_path=write_clip(str(tmp_path / "clip.avi")), output_dir=str(tmp_path / "out"),
+                      model=StubDetector(), backend="iou")
+    with pytest.raises(JobCancelled):
+        tracker.run(progress_callback=cancel)
+
+    assert len(opened) == 1 and opened[0].released
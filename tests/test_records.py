@@ -0,0 +1,55 @@
+import numpy as np
+from src.tracking.records import RECORD_DTYPE, Record, RecordBuffer
+
+
+def test_append_frame_grows_and_round_trips(tmp_path):
+    buffer = RecordBuffer(capacity=2)
+
+    for frame in range(5):
+        bboxes = np.array([[0, 0, 10, 20], [5, 5, 15, 25], [1, 2, 3, 4]]) + frame
+        buffer.append_frame(frame, bboxes, confs=[0.9, 0.8, 0.7], class_ids=0,
+                            track_ids=[1, 2, 3], field_pos=np.full((3, 2), float(frame)))
+
+    assert len(buffer) == 15
+    assert buffer.nbytes == 15 * RECORD_DTYPE.itemsize
+    assert [frame for frame, _ in buffer.frames()] == [0, 1, 2, 3, 4]
+
+    first = next(iter(buffer))
+    assert isinstance(first, Record)
+    assert first.bbox == (0.0, 0.0, 10.0, 20.0)
+
+    path = str(tmp_path / "records.npy")
+    buffer.save(path)
+    assert np.array_equal(RecordBuffer.load(path).data, buffer.data)
+
+
+def test_legacy_json_layouts():
+    buffer = RecordBuffer()
+    buffer.append_frame(1, [[0, 0, 10, 20]], track_ids=[7], field_pos=[[3.5, 4.0]])
+
+    tracks = buffer.to_tracking_json(3)
+    field = buffer.to_field_json(3)
+
+    assert [f["frame_id"] for f in tracks] == [0, 1, 2]
+    assert tracks[0]["tracks"] == []
+    assert tracks[1]["tracks"] == [{"track_id": 7, "bbox": [0, 0, 10, 20], "team": -1}]
+    assert field[1]["field_tracks"] == [{"track_id": 7, "field_pos": [3.5, 4.0], "team": -1}]
+
+
+def test_json_keeps_field_precision_and_rounds_confidences():
+    buffer = RecordBuffer()
+    field_pos = np.array([[52.123456789012, 33.987654321098]])
+    buffer.append_frame(0, [[0, 0, 10, 20]], confs=np.float32([0.9]), track_ids=[1], field_pos=field_pos)
+
+    assert buffer.to_field_json(1)[0]["field_tracks"][0]["field_pos"] == field_pos[0].tolist()
+    assert buffer.to_detection_json()[0]["confidence"] == 0.9
+
+
+def test_set_teams_labels_all_rows_of_a_track():
+    buffer = RecordBuffer()
+    buffer.append_frame(0, np.zeros((3, 4)), track_ids=[1, 2, 3])
+    buffer.append_frame(1, np.zeros((2, 4)), track_ids=[3, 1])
+
+    buffer.set_teams({1: 0, 3: 2})
+
+    assert buffer.data["team"].tolist() == [0, -1, 2, 2, 0]
@@ -0,0 +1,136 @@
+import numpy as np
+from src.analytics.streaming import StreamingAnalytics, batch_compute
+from synthetic import SyntheticMatch
+
+
+def synthetic_field_results(n_frames, n_players=10, seed=0, jitter=0.05, drop_every=7):
+    """
+    Field tracks of a synthetic match with position noise, dropouts, a late
+    substitute and a track that leaves the pitch.
+    """
+    match = SyntheticMatch(n_players=n_players, seed=seed)
+    rng = np.random.default_rng(seed)
+    results = []
+
+    for frame_id in range(n_frames):
+        positions = match.field_positions(frame_id) + rng.normal(0, jitter, (n_players, 2))
+        field_tracks = []
+        for i, (tid, team) in enumerate(zip(match.track_ids.tolist(), match.teams.tolist())):
+            if drop_every and (frame_id + i) % drop_every == 0:
+                continue
+            if tid == 1 and frame_id > n_frames // 3:
+                continue                      # leaves the pitch
+            if tid == 2 and frame_id < n_frames // 2:
+                continue                      # comes on late
+            field_tracks.append({"track_id": tid, "field_pos": positions[i].tolist(), "team": team})
+        results.append({"frame_id": frame_id, "field_tracks": field_tracks})
+
+    return results
+
+
+def assert_snapshots_match(live, offline, minutes=True):
+    assert live["frame_id"] == offline["frame_id"]
+    assert set(live["players"]) == set(offline["players"])
+
+    for tid, stats in offline["players"].items():
+        for key, value in stats.items():
+            if isinstance(value, float):
+                assert np.isclose(live["players"][tid][key], value, atol=1e-6), (tid, key)
+            else:
+                assert live["players"][tid][key] == value, (tid, key)
+
+    assert len(live["minutes"]) == len(offline["minutes"])
+    windows = list(zip(live["minutes"], offline["minutes"])) if minutes else []
+    for live_teams, offline_teams in windows + [(live["teams"], offline["teams"])]:
+        for group, shape in offline_teams.items():
+            if shape["centroid"] is None:
+                assert live_teams[group]["centroid"] is None
+                continue
+            assert np.allclose(live_teams[group]["centroid"], shape["centroid"], atol=1e-6)
+            assert np.isclose(live_teams[group]["compactness"], shape["compactness"], atol=1e-6)
+
+
+def test_streaming_matches_batch_recomputation():
+    field_results = synthetic_field_results(n_frames=400)
+
+    # Small window and slot count so ring wrap-around, slot recycling and growth are exercised
+    analytics = StreamingAnalytics(fps=25, window_seconds=2, max_players=4)
+    for frame in field_results:
+        analytics.update(frame["frame_id"], frame["field_tracks"])
+
+    live = analytics.snapshot()
+    offline = batch_compute(field_results, fps=25, window_seconds=2)
+
+    assert len(live["minutes"]) == 8
+    assert sum(stats["sprints"] for stats in live["players"].values()) > 0
+    assert_snapshots_match(live, offline)
+
+
+def test_relabel_applies_final_teams_to_rolling_window():
+    field_results = synthetic_field_results(n_frames=130)
+
+    analytics = StreamingAnalytics(fps=25, window_seconds=2, max_players=4)
+    for frame in field_results:
+        unlabeled = [dict(obj, team=-1) for obj in frame["field_tracks"]]
+        analytics.update(frame["frame_id"], unlabeled)
+
+    labels = {obj["track_id"]: obj["team"] for frame in field_results for obj in frame["field_tracks"]}
+    analytics.relabel(labels)
+
+    # Closed windows keep the labels known when they closed
+    live = analytics.snapshot()
+    assert live["minutes"][0]["Team A"]["centroid"] is None
+    assert_snapshots_match(live, batch_compute(field_results, fps=25, window_seconds=2), minutes=False)
+
+
+def test_snapshot_is_available_mid_stream():
+    field_results = synthetic_field_results(n_frames=120, drop_every=0)
+    analytics = StreamingAnalytics(fps=25, window_seconds=60)
+
+    for frame in field_results[:60]:
+        analytics.update(frame["frame_id"], frame["field_tracks"])
+
+    assert_snapshots_match(analytics.snapshot(), batch_compute(field_results[:60], fps=25, window_seconds=60))
+
+
+def test_distance_and_sprint_on_constant_speed_run():
+    analytics = StreamingAnalytics(fps=25, window_seconds=1)
+
+    # 2 s jog at 4 m/s, then 2 s sprint at 8 m/s
+    x = 0.0
+    for frame_id in range(100):
+        x += (4.0 if frame_id < 50 else 8.0) / 25
+        analytics.update(frame_id, [{"track_id": 7, "field_pos": [x, 30.0], "team": 0}])
+
+    stats = analytics.snapshot()["players"][7]
+    assert np.isclose(stats["distance"], x - 4.0 / 25)
+    assert stats["sprints"] == 1
+    assert np.isclose(stats["window_distance"], 8.0)   # last 25 frames at 8 m/s
+    assert 8.0 < stats["hir_distance"] < 16.0
+
+
+def test_consumes_tracker_field_tracks(tmp_path):
+    import json
+    from src.tracking.tracker import Tracker
+    from synthetic import StubDetector
+
+    match = SyntheticMatch(n_players=8)
+    video = match.write(str(tmp_path / "match.avi"), 60)
+
+    # Window covers the first frames, where team labels are still provisional (UNKNOWN)
+    analytics = StreamingAnalytics(fps=match.fps, window_seconds=4)
+
+    tracker = Tracker(video_path=video, output_dir=str(tmp_path / "out"), model=StubDetector(8),
+                      image_points=match.image_points, field_points=match.field_points, backend="iou")
+    tracker.run(field_callback=analytics.update)
+
+    # Compare against the saved output, which carries the final (backfilled) labels
+    with open(tracker.output_field_json) as f:
+        offline = batch_compute(json.load(f), fps=match.fps, window_seconds=4)
+
+    provisional = analytics.snapshot()
+    assert not np.allclose(provisional["teams"]["Team A"]["centroid"], offline["teams"]["Team A"]["centroid"],
+                           atol=1e-6)
+
+    analytics.relabel(tracker.team_classifier.labels)
+    assert_snapshots_match(analytics.snapshot(), offline)
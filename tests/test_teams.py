@@ -0,0 +1,90 @@
+import numpy as np
+from src.tracking.teams import REFEREE, UNKNOWN, TeamClassifier, torso_colors, torso_patches
+
+KITS = {
+    "red": (40, 40, 200), "blue": (200, 60, 30), "yellow": (0, 220, 230),
+    # Shade variations; the first two reds sit on opposite sides of the hue wrap-around
+    "red_a": (60, 30, 200), "red_b": (30, 60, 200), "red_c": (30, 30, 170),
+    "blue_a": (180, 70, 40), "blue_b": (220, 80, 50),
+}
+
+
+def render_players(kits):
+    frame = np.zeros((200, 40 * len(kits) + 20, 3), dtype=np.uint8)
+    frame[:] = (60, 150, 60)
+
+    bboxes = []
+    for i, kit in enumerate(kits):
+        x1 = 10 + 40 * i
+        frame[50:140, x1 + 4:x1 + 26] = KITS[kit]
+        bboxes.append([x1, 40, x1 + 30, 160])
+
+    return frame, np.array(bboxes)
+
+
+def test_torso_patches_sample_inside_boxes():
+    frame, bboxes = render_players(["red", "blue"])
+
+    patches = torso_patches(frame, bboxes, size=8)
+
+    assert patches.shape == (2, 8, 8, 3)
+    assert (patches[0] == KITS["red"]).all()
+    assert (patches[1] == KITS["blue"]).all()
+
+    colors = torso_colors(patches)
+    assert colors.shape == (2, 3)
+    assert np.linalg.norm(colors[0] - colors[1]) > 100
+
+
+def test_classifier_splits_teams_and_referee_once_per_track():
+    kits = ["red"] * 4 + ["blue"] * 3 + ["yellow"]
+    frame, bboxes = render_players(kits)
+    track_ids = np.arange(1, len(kits) + 1)
+
+    classifier = TeamClassifier(min_samples=2, min_tracks=6)
+    classifier.update(frame, bboxes, track_ids)
+    assert classifier.label(1) == UNKNOWN
+
+    classifier.update(frame, bboxes, track_ids)
+    labels = [classifier.label(tid) for tid in track_ids]
+
+    assert len(set(labels[:4])) == 1 and len(set(labels[4:7])) == 1
+    assert labels[0] != labels[4]
+    assert labels[7] == REFEREE
+
+    # Cached: labelled tracks are not re-classified, new tracks go to the nearest team
+    frame2, bboxes2 = render_players(["blue", "red"])
+    classifier.update(frame2, bboxes2, [1, 99])
+    classifier.update(frame2, bboxes2, [1, 99])
+    assert classifier.label(1) == labels[0]
+    assert classifier.label(99) == labels[0]
+
+
+def test_no_referee_when_only_two_kits_with_shade_variation():
+    kits = ["red", "red_a", "red_b", "red_c", "blue", "blue_a", "blue_b", "blue"]
+    frame, bboxes = render_players(kits)
+    track_ids = np.arange(1, len(kits) + 1)
+
+    classifier = TeamClassifier(min_samples=1, min_tracks=6)
+    classifier.update(frame, bboxes, track_ids)
+    labels = [classifier.label(tid) for tid in track_ids]
+
+    assert REFEREE not in labels
+    assert len(set(labels[:4])) == 1 and len(set(labels[4:])) == 1
+    assert labels[0] != labels[4]
+
+
+def test_refit_with_more_tracks_keeps_team_identities():
+    # First fit sees no referee; the refit with more tracks finds one
+    classifier = TeamClassifier(min_samples=1, min_tracks=6, refit_growth=1.5)
+    frame, bboxes = render_players(["red"] * 3 + ["blue"] * 3)
+    classifier.update(frame, bboxes, np.arange(1, 7))
+    first = [classifier.label(tid) for tid in range(1, 7)]
+    assert REFEREE not in first
+
+    frame, bboxes = render_players(["blue_a", "red_a", "yellow"])
+    classifier.update(frame, bboxes, [7, 8, 9])
+
+    assert [classifier.label(tid) for tid in range(1, 7)] == first
+    assert classifier.label(7) == first[3] and classifier.label(8) == first[0]
+    assert classifier.label(9) == REFEREE
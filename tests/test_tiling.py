@@ -0,0 +1,44 @@
+import numpy as np
+from src.detection.tiling import make_tiles, nms, select_tiles
+
+
+def test_tiles_cover_frame_with_equal_size():
+    tiles = make_tiles(1920, 1080, tile_size=640, overlap=0.2)
+
+    assert (tiles[:, 2] - tiles[:, 0] == 640).all()
+    assert (tiles[:, 3] - tiles[:, 1] == 640).all()
+    assert tiles[:, 2].max() == 1920 and tiles[:, 3].max() == 1080
+
+    covered = np.zeros((1080, 1920), dtype=bool)
+    for x1, y1, x2, y2 in tiles:
+        covered[y1:y2, x1:x2] = True
+    assert covered.all()
+
+
+def test_select_tiles_by_pitch_and_last_seen():
+    tiles = make_tiles(1920, 1080, tile_size=640, overlap=0.2)
+
+    pitch = select_tiles(tiles, (1080, 1920), pitch_polygon=[(0, 0), (500, 0), (500, 500), (0, 500)])
+    seen = select_tiles(tiles, (1080, 1920), last_boxes=[[1800, 1000, 1810, 1020]])
+
+    assert (tiles[pitch, 0] < 500).all() and pitch.sum() == 2
+    assert seen.sum() == 1 and tuple(tiles[seen][0]) == (1280, 440, 1920, 1080)
+
+
+def test_nms_merges_partial_boxes_across_tiles():
+    boxes = np.array([[0, 0, 10, 20], [0, 0, 10, 12], [100, 100, 110, 120], [1, 1, 11, 21]])
+    scores = [0.9, 0.8, 0.7, 0.95]
+
+    # The half box cut by a tile border survives IoU but not IoS
+    assert list(nms(boxes, scores, metric="iou")) == [3, 1, 2]
+    assert list(nms(boxes, scores, metric="ios")) == [3, 2]
+    assert list(nms(boxes, scores, class_ids=[0, 1, 0, 0])) == [3, 1, 2]
+
+
+def test_nms_keeps_overlapping_players_from_one_pass():
+    # Two players with IoU 0.44 (IoS 0.61) and a partial copy of the second from a tile
+    boxes = np.array([[600, 200, 700, 400], [630, 225, 730, 425], [630, 225, 640, 425]])
+    scores = [0.9, 0.8, 0.7]
+
+    assert list(nms(boxes, scores)) == [0]
+    assert list(nms(boxes, scores, sources=[0, 0, 1])) == [0, 1]
@@ -0,0 +1,174 @@
+"""
+Accuracy / throughput gate for the tracking stage.
+
+The stub detector only returns shuffled, ID-less boxes, so these gates exercise
+Tracker with backend="iou" (our own association in src/tracking/association.py).
+The default backend="bytetrack" runs inside ultralytics' model.track() and is
+not covered offline.
+"""
+
+import json
+import time
+import numpy as np
+from src.evaluation.metrics import frames_from_tracking_json, iou_matrix, mot_metrics, projection_errors
+from src.homography.field_mapping import FieldMapper
+from src.tracking.association import LOW_THRESH
+from src.tracking.tracker import Tracker
+from src.visualization.distance_ranking import calculate_distance
+from synthetic import SyntheticMatch, StubDetector
+
+N_FRAMES = 60
+
+MIN_MOTA = 0.99
+MIN_IDF1 = 0.99
+MAX_FIELD_ERROR = 0.2        # meters, mean over all tracked positions
+MAX_PROJECTION_ERROR = 1e-3  # meters, exact correspondences
+MIN_FPS = 20                 # tracking-stage throughput floor with the stub detector
+
+
+def run_tracker(tmp_path, match, n_frames=N_FRAMES, **stub_kwargs):
+    video = match.write(str(tmp_path / "match.avi"), n_frames)
+    tracker = Tracker(
+        video_path=video,
+        output_dir=str(tmp_path / "out"),
+        model=StubDetector(match.n_players, seed=match.seed, **stub_kwargs),
+        image_points=match.image_points,
+        field_points=match.field_points,
+        backend="iou",
+    )
+
+    start = time.perf_counter()
+    assert tracker.run()
+    elapsed = time.perf_counter() - start
+
+    return tracker, elapsed
+
+
+def ground_truth_ids(match, pred):
+    """
+    {predicted track ID: ground-truth ID} from the best-overlapping box on first appearance.
+    """
+    mapping = {}
+    for frame_id in sorted(pred):
+        ids, bboxes = pred[frame_id]
+        gt_boxes, gt_ids = match.boxes(frame_id)
+        best = iou_matrix(bboxes, gt_boxes).argmax(axis=1)
+        for tid, g in zip(ids.tolist(), gt_ids[best].tolist()):
+            mapping.setdefault(tid, g)
+    return mapping
+
+
+def test_tracking_accuracy_and_field_positions(tmp_path):
+    match = SyntheticMatch(n_players=8)
+    tracker, _ = run_tracker(tmp_path, match)
+
+    with open(tracker.output_json_path) as f:
+        pred = frames_from_tracking_json(json.load(f))
+    metrics = mot_metrics(match.gt_frames(N_FRAMES), pred)
+    to_gt = ground_truth_ids(match, pred)
+
+    assert metrics["mota"] >= MIN_MOTA, metrics
+    assert metrics["idf1"] >= MIN_IDF1, metrics
+    assert metrics["id_switches"] == 0
+
+    # Field coordinates against the known positions
+    with open(tracker.output_field_json) as f:
+        field = json.load(f)
+    errors = []
+    for frame in field:
+        truth = dict(zip(match.track_ids, match.field_positions(frame["frame_id"])))
+        for obj in frame["field_tracks"]:
+            errors.append(np.linalg.norm(np.array(obj["field_pos"]) - truth[to_gt[obj["track_id"]]]))
+    assert len(errors) == N_FRAMES * match.n_players
+    assert np.mean(errors) <= MAX_FIELD_ERROR
+
+    # Jersey-color teams: both teams separated, referee found
+    teams = {to_gt[obj["track_id"]]: obj["team"] for obj in field[-1]["field_tracks"]}
+    labels = [teams[tid] for tid in match.track_ids]
+    assert labels[-1] == 2
+    assert len({labels[i] for i in range(0, 7, 2)}) == 1
+    assert len({labels[i] for i in range(1, 7, 2)}) == 1
+    assert labels[0] != labels[1]
+
+
+def test_tracking_accuracy_full_squad_with_missed_detections(tmp_path):
+    match = SyntheticMatch(n_players=22, seed=2)
+    tracker, _ = run_tracker(tmp_path, match, drop_every=5)
+
+    with open(tracker.output_json_path) as f:
+        metrics = mot_metrics(match.gt_frames(N_FRAMES), frames_from_tracking_json(json.load(f)))
+
+    assert metrics["mota"] >= 0.95, metrics
+    assert metrics["idf1"] >= 0.95, metrics
+
+    # Low-score detections must reach IoUTracker's recovery stage
+    assert tracker.model.conf == LOW_THRESH
+
+
+def test_metrics_penalize_misses_and_id_switches():
+    match = SyntheticMatch(n_players=4)
+    gt = match.gt_frames(20)
+
+    assert mot_metrics(gt, gt)["mota"] == 1.0
+
+    # Swap the IDs of players 1 and 2 halfway through
+    swapped = {}
+    for frame_id, (ids, boxes) in gt.items():
+        ids = ids.copy()
+        if frame_id >= 10:
+            ids[[0, 1]] = ids[[1, 0]]
+        swapped[frame_id] = (ids, boxes)
+    metrics = mot_metrics(gt, swapped)
+    assert metrics["id_switches"] == 2
+    assert metrics["idf1"] == 0.75
+
+    # Drop one player entirely
+    missing = {frame_id: (ids[1:], boxes[1:]) for frame_id, (ids, boxes) in gt.items()}
+    metrics = mot_metrics(gt, missing)
+    assert metrics["misses"] == 20
+    assert metrics["mota"] == 0.75
+
+
+def test_tracking_recovers_after_dropped_detections(tmp_path):
+    match = SyntheticMatch(n_players=6, seed=1)
+    tracker, _ = run_tracker(tmp_path, match, drop_every=3)
+
+    with open(tracker.output_json_path) as f:
+        metrics = mot_metrics(match.gt_frames(N_FRAMES), frames_from_tracking_json(json.load(f)))
+
+    assert metrics["misses"] == N_FRAMES // 3
+    assert metrics["false_positives"] == 0
+    assert metrics["id_switches"] == 0
+
+
+def test_field_mapper_projection_error():
+    match = SyntheticMatch()
+    mapper = FieldMapper()
+    mapper.set_correspondences(match.image_points, match.field_points)
+
+    errors = []
+    for frame_id in range(0, 500, 25):
+        bboxes, _ = match.boxes(frame_id)
+        errors.append(projection_errors(mapper, bboxes, match.field_positions(frame_id)))
+
+    assert np.mean(errors) <= MAX_PROJECTION_ERROR
+
+
+def test_calculate_distance_on_known_paths():
+    # Straight run at 5 m/s for 10 s sampled at 25 fps
+    t = np.arange(0, 10 + 1e-9, 1 / 25)
+    straight = np.stack([10 + 5 * t, np.full_like(t, 34)], axis=1)
+    assert abs(calculate_distance(straight) - 50.0) < 1e-9
+
+    # Full lap of the center circle (radius 9.15 m), finely sampled
+    theta = np.linspace(0, 2 * np.pi, 2001)
+    circle = np.stack([52.5 + 9.15 * np.cos(theta), 34 + 9.15 * np.sin(theta)], axis=1)
+    assert abs(calculate_distance(circle) - 2 * np.pi * 9.15) < 1e-3
+
+
+def test_tracking_throughput_floor(tmp_path):
+    match = SyntheticMatch(n_players=22)
+    _, elapsed = run_tracker(tmp_path, match, n_frames=100)
+
+    fps = 100 / elapsed
+    assert fps >= MIN_FPS, f"tracking throughput {fps:.1f} FPS below floor of {MIN_FPS}"
@@ -1,11 +1,25 @@
+import cv2
+import pytest
 from src.preprocessing.video_loader import VideoLoader
+from synthetic import write_clip
 
-# Your video file
-video_path = "data/raw/1.mp4"
 
-# Load video
-loader = VideoLoader(video_path)
-cap = loader.load()
+def test_load_returns_open_capture(tmp_path):
+    video_path = write_clip(str(tmp_path / "clip.avi"), n_frames=10, width=320, height=180)
 
-# Release video when done
-cap.release()
+    # Load video
+    loader = VideoLoader(video_path)
+    cap = loader.load()
+
+    assert cap.isOpened()
+    assert int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) == 320
+    assert int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == 180
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 10
+
+    # Release video when done
+    cap.release()
+
+
+def test_missing_video_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        VideoLoader(str(tmp_path / "missing.mp4")).load()